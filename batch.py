@@ -0,0 +1,185 @@
+from functools import partial
+
+import numpy as np
+
+from classes import DECK, PIPS, STATE_NEXT, STATE_SOFT, STATE_VALUE, VALUES
+
+
+STAND, HIT, DOUBLE = 0, 1, 2
+RANK_PIPS = np.array(PIPS, dtype=np.int16)
+NEXT_STATE = np.array([list(row) for row in STATE_NEXT], dtype=np.uint8)
+STATE_VALUES = np.array(STATE_VALUE, dtype=np.int16)
+STATE_SOFT_ACES = np.array(STATE_SOFT, dtype=np.int16)
+
+
+def dealer_table():
+    '''A strategy table that hits every total below 17.'''
+    table = np.full((22, 2, 10), STAND, dtype=np.int8)
+    table[:17] = HIT
+    return table
+
+
+MOVES = {STAND: "STAND", HIT: "HIT", DOUBLE: "DOUBLE DOWN"}
+
+
+def table_move(table, player_hand, dealer_hand, legal_moves):
+    action = table[
+        player_hand.value, int(player_hand.soft), dealer_hand.cards[0].pip - 2
+    ]
+    player_move = MOVES[action]
+    if player_move not in legal_moves:
+        return "HIT"
+    return player_move
+
+
+def table_strategy(table):
+    '''A Bot move strategy that plays the same table as simulate().'''
+    return partial(table_move, table)
+
+
+class BatchShoes:
+    '''N independent shoes of card codes dealt in lockstep.
+
+    Each row of cards is one shoe and position holds its read cursor.
+    Rows whose cursor has passed the cut card are reshuffled together
+    between rounds.'''
+
+    def __init__(self, tables, decks=4, penetration=0.75, rng=None):
+        self.rng = np.random.default_rng(rng)
+        deck = np.frombuffer(DECK * decks, dtype=np.uint8)
+        self.cards = self.rng.permuted(np.tile(deck, (tables, 1)), axis=1)
+        self.position = np.zeros(tables, dtype=np.intp)
+        self.cut_card = int(len(deck) * penetration)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def shuffle(self, rows):
+        self.cards[rows] = self.rng.permuted(self.cards[rows], axis=1)
+        self.position[rows] = 0
+
+    def shuffle_passed_cut_card(self):
+        rows = np.flatnonzero(self.position >= self.cut_card)
+        if len(rows):
+            self.shuffle(rows)
+
+    def draw(self, rows):
+        empty = rows[self.position[rows] == self.cards.shape[1]]
+        if len(empty):
+            self.shuffle(empty)
+        codes = self.cards[rows, self.position[rows]]
+        self.position[rows] += 1
+        return codes % len(VALUES)
+
+
+class ShuffleBank:
+    '''Shuffled orders of a shoe of `decks` decks, generated `shoes` at
+    a time by one vectorized call into a preallocated array.
+
+    A bank can be given as the rng of any number of Dealers or Shoes of
+    the same size. Each shuffle copies the next unused order into the
+    shoe, so reshuffling costs one copy until the bank is refilled. A
+    discard tray, being smaller, is shuffled directly.'''
+
+    def __init__(self, rng=None, decks=4, shoes=256):
+        self.rng = np.random.default_rng(rng)
+        self.deck = np.frombuffer(DECK * decks, dtype=np.uint8)
+        self.orders = np.empty((shoes, len(self.deck)), dtype=np.uint8)
+        self.next = shoes
+
+    def refill(self):
+        self.orders[:] = self.deck
+        self.rng.permuted(self.orders, axis=1, out=self.orders)
+        self.next = 0
+
+    def shuffle(self, cards):
+        if len(cards) != self.orders.shape[1]:
+            self.rng.shuffle(np.frombuffer(cards, dtype=np.uint8))
+            return
+        if self.next == len(self.orders):
+            self.refill()
+        memoryview(cards)[:] = self.orders[self.next]
+        self.next += 1
+
+    def random(self):
+        return self.rng.random()
+
+
+class BatchHands:
+    '''Hand states, totals and usable-ace counts of one hand at each of
+    N tables. Dealing moves each state on by one gather from the
+    classes.STATE_NEXT table.'''
+
+    def __init__(self, tables):
+        self.state = np.zeros(tables, dtype=np.uint8)
+        self.value = np.zeros(tables, dtype=np.int16)
+        self.soft_aces = np.zeros(tables, dtype=np.int16)
+        self.cards = np.zeros(tables, dtype=np.int16)
+
+    def append(self, rows, ranks):
+        state = NEXT_STATE[self.state[rows], ranks]
+        self.state[rows] = state
+        self.value[rows] = STATE_VALUES[state]
+        self.soft_aces[rows] = STATE_SOFT_ACES[state]
+        self.cards[rows] += 1
+
+
+def play_round(shoes, table, bet=10):
+    '''Play one round at every table and return each table's net chips.'''
+    tables = len(shoes)
+    every = np.arange(tables)
+    player, dealer = BatchHands(tables), BatchHands(tables)
+    shoes.shuffle_passed_cut_card()
+    player.append(every, shoes.draw(every))
+    up_card = shoes.draw(every)
+    dealer.append(every, up_card)
+    player.append(every, shoes.draw(every))
+    dealer.append(every, shoes.draw(every))
+    up_card = RANK_PIPS[up_card] - 2
+
+    stake = np.full(tables, bet, dtype=np.int64)
+    active = every
+    while len(active):
+        value = player.value[active]
+        action = np.where(
+            value > 21, STAND,
+            table[np.minimum(value, 21), player.soft_aces[active],
+                  up_card[active]]
+        )
+        action[(action == DOUBLE) & (player.cards[active] > 2)] = HIT
+        drawing = active[action != STAND]
+        player.append(drawing, shoes.draw(drawing))
+        stake[active[action == DOUBLE]] *= 2
+        active = active[action == HIT]
+
+    bust = player.value > 21
+    drawing = every[~bust & (dealer.value < 17)]
+    while len(drawing):
+        dealer.append(drawing, shoes.draw(drawing))
+        drawing = drawing[dealer.value[drawing] < 17]
+
+    dealer_value = np.where(dealer.value > 21, 0, dealer.value)
+    lost = bust | (player.value < dealer_value)
+    won = ~lost & (player.value > dealer_value)
+    return np.where(won, stake, np.where(lost, -stake, 0)), bust
+
+
+def simulate(tables, rounds, table=None, decks=4, penetration=0.75, bet=10,
+             seed=None):
+    '''Play `rounds` rounds at each of `tables` independent tables.'''
+    if table is None:
+        table = dealer_table()
+    shoes = BatchShoes(tables, decks, penetration, seed)
+    results = {
+        "rounds": 0, "net": 0, "wins": 0, "losses": 0, "pushes": 0,
+        "busts": 0
+    }
+    for _ in range(rounds):
+        net, bust = play_round(shoes, table, bet)
+        results["rounds"] += tables
+        results["net"] += int(net.sum())
+        results["wins"] += int(np.count_nonzero(net > 0))
+        results["losses"] += int(np.count_nonzero(net < 0))
+        results["pushes"] += int(np.count_nonzero(net == 0))
+        results["busts"] += int(np.count_nonzero(bust))
+    return results
@@ -0,0 +1,152 @@
+import json
+import platform
+
+from argparse import ArgumentParser
+from random import Random
+from sys import exit
+from timeit import Timer
+
+from classes import Bot, Card, Dealer, Hand
+from engine import flat_bet, mimic_dealer, next_round
+import main
+
+try:
+    from batch import ShuffleBank
+except ImportError:
+    ShuffleBank = None
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name, number=10000):
+    '''Register a benchmark. The decorated function does any setup and
+    returns the statement to time; `number` calls make one sample.'''
+    def register(func):
+        BENCHMARKS[name] = (func, number)
+        return func
+    return register
+
+
+@benchmark("card_construct", number=100000)
+def card_construct():
+    return lambda: Card("Hearts", "Queen")
+
+
+@benchmark("hand_value_hard", number=100000)
+def hand_value_hard():
+    hand = Hand([Card("Clubs", 10), Card("Hearts", 6), Card("Spades", 4)])
+    return lambda: hand.value
+
+
+@benchmark("hand_value_soft", number=100000)
+def hand_value_soft():
+    hand = Hand([
+        Card("Clubs", "Ace"), Card("Hearts", "Ace"), Card("Spades", 6)
+    ])
+    return lambda: hand.value
+
+
+@benchmark("hand_build_soft", number=100000)
+def hand_build_soft():
+    cards = [Card("Clubs", "Ace"), Card("Hearts", 6), Card("Spades", "Ace")]
+    return lambda: Hand(cards)
+
+
+@benchmark("dealer_shuffle_cards", number=1000)
+def dealer_shuffle_cards():
+    dealer = Dealer()
+    return dealer.shuffle_cards
+
+
+if ShuffleBank is not None:
+    @benchmark("dealer_shuffle_bank", number=1000)
+    def dealer_shuffle_bank():
+        dealer = Dealer(rng=ShuffleBank(0))
+        return dealer.shuffle_cards
+
+
+def deal_at(depth):
+    def setup():
+        dealer = Dealer()
+
+        def deal():
+            dealer.cards.position = depth
+            dealer.deal("HIT")
+        return deal
+    return setup
+
+
+for depth in (0, 104, 200):
+    benchmark(f"dealer_deal_depth_{depth}", number=100000)(deal_at(depth))
+
+
+@benchmark("game_round", number=2000)
+def game_round():
+    player = Bot(flat_bet(10), mimic_dealer, chips=10 ** 12)
+    dealer = Dealer(rng=Random(0))
+
+    def play():
+        main.game(player, dealer)
+        next_round(player, dealer)
+    return play
+
+
+def run(names=None, repeat=5):
+    results = {}
+    for name, (setup, number) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        best = min(Timer(setup()).repeat(repeat, number)) / number
+        results[name] = {
+            "usec_per_op": best * 1e6, "ops_per_sec": 1 / best
+        }
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+
+
+def compare(report, baseline, tolerance=0.1):
+    '''Each benchmark's throughput relative to the baseline, and the
+    names of those slower than the baseline by more than `tolerance`.'''
+    ratios, regressions = {}, []
+    for name, result in report["results"].items():
+        if name not in baseline["results"]:
+            continue
+        base = baseline["results"][name]
+        ratio = result["ops_per_sec"] / base["ops_per_sec"]
+        ratios[name] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+    return ratios, regressions
+
+
+def cli():
+    parser = ArgumentParser(description="Blackjack hot path benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    report = run(args.names, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        ratios, regressions = compare(report, baseline, args.tolerance)
+        for name, ratio in ratios.items():
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<24} {ratio:6.2f}x{flag}")
+        if regressions:
+            exit(1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,130 @@
+import hashlib
+import mmap
+import os
+import struct
+
+from array import array, typecodes
+
+
+CACHE_DIR = os.environ.get("BLACKJACK_CACHE") or os.path.join(
+    os.path.expanduser("~"), ".cache", "blackjack"
+)
+MAX_BYTES = 64 * 2 ** 20
+MAGIC = b"BJTB"
+VERSION = 1
+HEADER = struct.Struct("<4sBcxxQ")
+SUFFIX = ".tbl"
+
+
+def table_key(*parts):
+    '''A stable name for the table computed from `parts`, such as the
+    rules, deck count and shoe composition it depends on. Parts must
+    have a repr that is the same in every run.'''
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+class TableCache:
+    '''Computed tables kept on disk between runs, one file per table
+    named by its key. A file is a HEADER and the raw items of an array,
+    so loading maps the file and casts it without parsing; the tables
+    returned are read-only memoryviews of the mapping.
+
+    The files take at most `max_bytes`: storing a table deletes the
+    least recently used ones, by modification time, which every hit
+    refreshes, until they fit. Tables are written under a temporary name
+    and renamed into place, so other processes never read one half
+    written. A cache that cannot be read or written is skipped: gets
+    miss and tables are not stored.'''
+
+    def __init__(self, path=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def file(self, key):
+        return os.path.join(self.path, key + SUFFIX)
+
+    def get(self, key):
+        '''The table stored under `key`, or None.'''
+        path = self.file(key)
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mapping) < HEADER.size:
+            mapping.close()
+            return None
+        magic, version, typecode, count = HEADER.unpack_from(mapping)
+        typecode = typecode.decode("latin-1")
+        table = memoryview(mapping)[HEADER.size:]
+        if (
+            magic != MAGIC or version != VERSION or typecode not in typecodes
+            or len(table) != count * array(typecode).itemsize
+        ):
+            table.release()
+            mapping.close()
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return table.cast(typecode)
+
+    def put(self, key, table):
+        '''Store `table`, an array.array, under `key` and return whether
+        it was stored.'''
+        path = self.file(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(temporary, "wb") as f:
+                f.write(HEADER.pack(
+                    MAGIC, VERSION, table.typecode.encode(), len(table)
+                ))
+                table.tofile(f)
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return False
+        self.evict()
+        return True
+
+    def load(self, key, compute):
+        '''The table stored under `key`, or the array.array returned by
+        compute(), which is stored under it if the cache can be
+        written.'''
+        table = self.get(key)
+        if table is None:
+            table = compute()
+            self.put(key, table)
+            table = memoryview(table)
+        return table
+
+    def evict(self, max_bytes=None):
+        '''Delete the least recently used tables until the rest take at
+        most `max_bytes`, by default the cache's own cap.'''
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        try:
+            entries = [
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.path)
+                if entry.name.endswith(SUFFIX)
+            ]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        self.evict(0)
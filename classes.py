@@ -1,94 +1,212 @@
 import re
 
+from array import array
 from functools import reduce
+from itertools import islice
 from textwrap import dedent
-from random import shuffle
+from random import Random
 
-from exceptions import BetError
-from helpers import cls
+from exceptions import BetError, MoveError
+from helpers import screen
 
 
-class Card:
+SUITS = ('Clubs', 'Diamonds', 'Spades', 'Hearts')
+VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 'Jack', 'Queen', 'King', 'Ace')
+PIPS = (2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11)
+ACE = VALUES.index('Ace')
+
+SUIT_CODES = {suit: i for i, suit in enumerate(SUITS)}
+SUIT_CODES.update({suit[:-1]: i for i, suit in enumerate(SUITS)})
+RANK_CODES = {value: i for i, value in enumerate(VALUES)}
+DECK = bytes(range(len(SUITS) * len(VALUES)))
+
+
+class CountSystem:
+    '''A card counting system: the weight each rank, 2 through Ace, adds
+    to the running count when dealt, and the running count a fresh shoe
+    of `decks` decks starts at (irc + irc_per_deck * decks).'''
+
+    def __init__(self, name, rank_weights, irc=0, irc_per_deck=0):
+        self.name = name
+        self.rank_weights = tuple(rank_weights)
+        self.weights = tuple(
+            self.rank_weights[code % len(VALUES)] for code in DECK
+        )
+        self.irc = irc
+        self.irc_per_deck = irc_per_deck
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name!r})"
+
+    def initial_count(self, decks):
+        return self.irc + self.irc_per_deck * decks
+
+
+HI_LO = CountSystem("Hi-Lo", (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1))
+KO = CountSystem(
+    "KO", (1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1, -1),
+    irc=4, irc_per_deck=-4
+)
+OMEGA_II = CountSystem(
+    "Omega II", (1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0)
+)
+COUNT_SYSTEMS = {system.name: system for system in (HI_LO, KO, OMEGA_II)}
 
-    def __init__(self, suit, value):
-        self.suit = suit
-        if value not in ['Jack', 'Queen', 'King', 'Ace']:
-            self.pip = value
-        else:
-            setattr(self, 'face_card', value)
-            self.pip = 11 if self.face_card == "Ace" else 10
+
+class Card:
+    '''A playing card. Only 52 instances ever exist; Card(suit, value)
+    returns the shared instance for that suit and value and a shoe
+    stores cards by their integer code (index into CARDS).'''
+
+    __slots__ = ('code', 'rank', 'suit', 'pip', 'face_card', 'name')
+
+    def __new__(cls, suit, value):
+        return CARDS[SUIT_CODES[suit] * len(VALUES) + RANK_CODES[value]]
+
+    @classmethod
+    def _intern(cls, code):
+        card = object.__new__(cls)
+        card.code = code
+        card.rank = code % len(VALUES)
+        card.suit = SUITS[code // len(VALUES)]
+        card.pip = PIPS[card.rank]
+        value = VALUES[card.rank]
+        card.face_card = value if isinstance(value, str) else None
+        card.name = f"{value} of {card.suit}"
+        return card
 
     def __str__(self):
-        if hasattr(self, 'face_card'):
-            return f"{self.face_card} of {self.suit}"
-        return f"{self.pip} of {self.suit}"
+        return self.name
 
     def __repr__(self):
-        if hasattr(self, 'face_card'):
-            return f"{self.__class__.__name__}({self.suit}, {self.face_card})"
-        return f"{self.__class__.__name__}({self.suit}, {self.pip})"
+        return (
+            f"{self.__class__.__name__}"
+            f"({self.suit}, {self.face_card or self.pip})"
+        )
+
+    def __reduce__(self):
+        return (Card, (self.suit, VALUES[self.rank]))
+
+    def __hash__(self):
+        return self.rank
 
     def __eq__(self, other):
-        case1 = hasattr(self, 'face_card') and not hasattr(other, 'face_card')
-        case2 = not hasattr(self, 'face_card') and hasattr(other, 'face_card')
-        if case1 or case2:
+        if (self.face_card is None) != (other.face_card is None):
             raise Exception(
                 "Cards can only be split if they are of the same pip/face card"
             )
-        face_cards = all(hasattr(card, 'face_card') for card in [self, other])
-        if not face_cards:
-            if self.pip != other.pip:
+        if self.rank != other.rank:
+            if self.face_card is None:
                 raise Exception(
                     "Split Failed: Cards are not of the same pip value"
                 )
-            return self.pip == other.pip
-        elif face_cards:
-            if self.face_card != other.face_card:
-                raise Exception(
-                    "Split Failed: Cards are not of the same face card"
-                )
-            return self.face_card == other.face_card
+            raise Exception(
+                "Split Failed: Cards are not of the same face card"
+            )
+        return True
+
+
+CARDS = tuple(Card._intern(code) for code in DECK)
+MAX_LOW = 31
+
+
+def hand_states():
+    '''Every state a hand can reach, numbered from 0 for the empty hand,
+    and for each the state that dealing each rank leads to.
+
+    A state is (cards, low, ace, pair): the number of cards up to 3, the
+    total counting aces as 1 (held at MAX_LOW, which only dealing to a
+    bust hand can pass), whether the hand holds an ace and, with one
+    card, its rank or, with two, whether they are a pair.'''
+    states = [(0, 0, False, None)]
+    numbers = {states[0]: 0}
+    next_states = []
+    for cards, low, ace, pair in states:
+        row = []
+        for rank in range(len(VALUES)):
+            if cards == 0:
+                next_pair = rank
+            elif cards == 1:
+                next_pair = pair == rank
+            else:
+                next_pair = False
+            pip = 1 if rank == ACE else PIPS[rank]
+            state = (
+                min(cards + 1, 3), min(low + pip, MAX_LOW),
+                ace or rank == ACE, next_pair
+            )
+            if state not in numbers:
+                numbers[state] = len(states)
+                states.append(state)
+            row.append(numbers[state])
+        next_states.append(bytes(row))
+    return states, tuple(next_states)
+
+
+HAND_STATES, STATE_NEXT = hand_states()
+STATE_VALUE = tuple(
+    low + 10 if ace and low <= 11 else low for _, low, ace, _ in HAND_STATES
+)
+STATE_SOFT = tuple(ace and low <= 11 for _, low, ace, _ in HAND_STATES)
+STATE_BUST = tuple(low > 21 for _, low, _, _ in HAND_STATES)
+STATE_PAIR = tuple(
+    cards == 2 and pair is True for cards, _, _, pair in HAND_STATES
+)
+STATE_BLACKJACK = tuple(
+    cards == 2 and low == 11 and ace for cards, low, ace, _ in HAND_STATES
+)
 
 
 class Hand:
+    '''A blackjack hand. It carries the number of its state in
+    HAND_STATES, which appending a card moves on with one lookup in
+    STATE_NEXT; its value, softness and bust status are read from the
+    state tables at the same time, so reading them never re-sums the
+    cards. Cards must be added with append(). `payout` is the chips the
+    hand returned once it is settled.'''
 
     def __init__(self, cards):
-        self.cards = cards
+        self.cards = []
+        self.state = 0
+        self.value = 0
+        self.soft_aces = 0
         self.win = False
         self.bust = False
         self.soft = False
         self.split = False
         self.double_down = False
+        self.push = False
+        self.surrender = False
+        self.bet = 0
+        self.payout = None
+        self.moves = []
+        for card in cards:
+            self.append(card)
+
+    def append(self, card):
+        self.cards.append(card)
+        state = self.state = STATE_NEXT[self.state][card.rank]
+        self.value = STATE_VALUE[state]
+        self.soft = STATE_SOFT[state]
+        self.soft_aces = int(self.soft)
+        self.bust = STATE_BUST[state]
 
     @property
-    def value(self):
-        _value = sum(card.pip for card in self.cards)
-        if _value > 21:
-            total_aces = filter(
-                lambda i: (
-                    (hasattr(self.cards[i], 'face_card') and
-                    self.cards[i].face_card == "Ace")
-                ), range(len(self.cards)))
-            for ace_index in total_aces:
-                self.cards[ace_index].pip = 1
-                _value = sum(card.pip for card in self.cards)
-                if _value < 21:
-                    return _value
-        return _value
+    def pair(self):
+        '''Whether the hand is two cards of the same rank.'''
+        return STATE_PAIR[self.state]
+
+    @property
+    def blackjack(self):
+        '''Whether the hand is two cards worth 21.'''
+        return STATE_BLACKJACK[self.state]
 
     def __str__(self):
         return reduce(lambda x, y: f"{x},  {y}", self.cards)
         # return reduce(lambda y, z: f"{y}\n{z}", self.cards)
 
     def __repr__(self):
-        cls = f"{self.__class__.__name__}(["
-        cls += ", ".join(
-            f"Card({card.suit}, {card.face_card})"
-            if hasattr(card, 'face_card')
-            else f"Card({card.suit}, {card.pip})"
-            for card in self.cards
-        )
-        return f"{cls}])"
+        return f"{self.__class__.__name__}([{', '.join(map(repr, self.cards))}])"
 
     def __gt__(self, other):
         return self.value > other.value
@@ -110,11 +228,14 @@ class Player:
         self.chips = 50
         self.placed_bet = 0
         self.winner = False
+        self.advisor = None
 
     def __str__(self):
         return "Player"
 
-    def bet(self):
+    def bet(self, player_hand=None):
+        '''The opening bet of a round or, once the hands are dealt, a
+        second bet of `player_hand`'s own bet to split or double it.'''
         if self.chips < 10 and not self.hands:
             raise BetError(
                 "Player cannot meet minimum bet requirement...GAME OVER"
@@ -126,33 +247,55 @@ class Player:
                 )
                 matched_bet = re.match(r"^\d{2}(?!\D+)$", placed_bet)
                 if matched_bet:
-                    placed_bet = int(matched_bet.group())
-                    if placed_bet >= 10 and placed_bet <= self.chips:
-                        self.chips -= placed_bet
-                        self.placed_bet = placed_bet
-                        return self.placed_bet
+                    try:
+                        return self.place_bet(int(matched_bet.group()))
+                    except BetError:
+                        pass
                 print("\nInvalid bet by player...")
                 continue
-        second_bet = self.chips - self.placed_bet
-        if second_bet < 0:
+        second_bet = player_hand.bet
+        if second_bet > self.chips:
             raise BetError(
                 "\nBet placed is greater than chip stack...bet not allowed"
             )
-        self.chips -= self.placed_bet
-        self.placed_bet *= 2
+        self.chips -= second_bet
+        self.placed_bet += second_bet
         return self.placed_bet
 
+    def place_bet(self, placed_bet):
+        if placed_bet < 10 or placed_bet > self.chips:
+            raise BetError("\nInvalid bet by player...")
+        self.chips -= placed_bet
+        self.placed_bet = placed_bet
+        return self.placed_bet
+
+    def legal_moves(self, player_hand):
+        moves = ["HIT", "STAND"]
+        if len(player_hand) < 3 and self.chips >= player_hand.bet:
+            if len(self.hands) == 1 and player_hand.pair:
+                moves.append("SPLIT")
+            if not player_hand.double_down:
+                moves.append("DOUBLE DOWN")
+        return moves
+
     def check_hand(self, player_hand, dealer_hand):
-        cls()
-        if player_hand.value > 21 and all(card.pip != 11 for card in player_hand.cards):
+        if player_hand.bust:
             return "BUST"
+        ev = {}
+        if self.advisor is not None:
+            ev = {
+                move: f" (EV {value:+.3f})"
+                for move, value in self.advisor.action_values(
+                    player_hand, dealer_hand, self.legal_moves(player_hand)
+                ).items()
+            }
         while True:
-            print(dedent(f'''
+            screen.draw(dedent(f'''
                 BLACKJACK OPTIONS:
-                    * HIT - Request another card from the dealer
-                    * STAND - Play your hand against the dealer as is
-                    * SPLIT - Split your hand if your cards are of the same pip/face card
-                    * DOUBLE DOWN - Request another card and play your hand against the dealer as is
+                    * HIT - Request another card from the dealer{ev.get("HIT", "")}
+                    * STAND - Play your hand against the dealer as is{ev.get("STAND", "")}
+                    * SPLIT - Split your hand if your cards are of the same pip/face card{ev.get("SPLIT", "")}
+                    * DOUBLE DOWN - Request another card and play your hand against the dealer as is{ev.get("DOUBLE DOWN", "")}
 
                 Player info: Bet: {self.placed_bet} --- Chips: {self.chips}
                 +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -169,82 +312,215 @@ class Player:
                 )
                 if matched_move:
                     if player_move == "SPLIT":
-                        if len(self.hands) == 1:
-                            try:
-                                player_hand.cards[0] == player_hand.cards[1]
-                                try:
-                                    self.bet()
-                                    return player_move
-                                except BetError as e:
-                                    print(e)
-                                    cls()
-                                    break
-                            except Exception as e:
-                                print(f"\n{e}")
-                                cls()
-                                break
-                        else:
-                            print("Only your initial hand can be split... move not allowed")
-                            cls()
+                        if len(self.hands) != 1:
+                            screen.message("Only your initial hand can be split... move not allowed")
+                            break
+                        if not player_hand.pair:
+                            screen.message(
+                                "\nCards can only be split if they are of the same pip/face card"
+                            )
+                            break
+                        try:
+                            self.bet(player_hand)
+                            return player_move
+                        except BetError as e:
+                            screen.message(e)
                             break
                     elif player_move == "DOUBLE DOWN":
                         if len(player_hand) < 3 and not player_hand.double_down:
                             try:
-                                self.bet()
+                                self.bet(player_hand)
                                 player_hand.double_down = True
                                 return player_move
                             except BetError as e:
-                                print(e)
-                                cls()
+                                screen.message(e)
                                 break
-                        print("\nCannot double down on this hand...")
-                        cls()
+                        screen.message("\nCannot double down on this hand...")
                         break
                     else:
                         return player_move
-                cls()
                 break
 
     def collect_hand(self, hand):
         self.hands.append(hand)
 
 
+class Bot(Player):
+    '''A player whose bets and moves are made by strategy callables
+    instead of the terminal.
+
+    bet_strategy(player) returns the opening bet for a round and
+    move_strategy(player_hand, dealer_hand, moves) returns one of the
+    legal moves offered for the hand.'''
+
+    def __init__(self, bet_strategy, move_strategy, chips=50):
+        super().__init__()
+        self.chips = chips
+        self.bet_strategy = bet_strategy
+        self.move_strategy = move_strategy
+
+    def bet(self, player_hand=None):
+        if self.hands:
+            return super().bet(player_hand)
+        if self.chips < 10:
+            raise BetError(
+                "Player cannot meet minimum bet requirement...GAME OVER"
+            )
+        return self.place_bet(self.bet_strategy(self))
+
+    def check_hand(self, player_hand, dealer_hand):
+        if player_hand.bust:
+            return "BUST"
+        moves = self.legal_moves(player_hand)
+        player_move = self.move_strategy(player_hand, dealer_hand, moves)
+        if player_move not in moves:
+            raise MoveError(f"{player_move} is not allowed on {player_hand}")
+        if player_move == "SPLIT":
+            self.bet(player_hand)
+        elif player_move == "DOUBLE DOWN":
+            self.bet(player_hand)
+            player_hand.double_down = True
+        return player_move
+
+
+class Shoe:
+    '''The card codes of one or more decks dealt from a read cursor.
+
+    Cards behind the cursor have been dealt: the first `discarded` of
+    them are the discard tray of finished rounds and the rest are on
+    the table. Once the cursor passes the cut card the shoe should be
+    reshuffled before the next round; it is shuffled in place, so no new
+    array is built. A shoe that runs out mid-round reshuffles only its
+    discard tray.
+
+    With `csm` the shoe is a continuous shuffling machine: discards are
+    swapped back into random places among the undealt cards after every
+    round and it never needs a reshuffle.
+
+    `rng` is anything whose shuffle(cards) shuffles the array of codes
+    in place and whose random() returns a float in [0, 1): a
+    random.Random (the default), a NumPy Generator or a
+    batch.ShuffleBank of shoe orders generated in bulk.
+
+    The running count of `count_system` is kept up to date as cards are
+    drawn and reset whenever the cards are shuffled.'''
+
+    def __init__(self, decks=4, penetration=0.75, rng=None, csm=False,
+                 count_system=HI_LO):
+        self.decks = decks
+        self.penetration = penetration
+        self.rng = rng if rng is not None else Random()
+        self.csm = csm
+        self.count_system = count_system
+        self.weights = count_system.weights
+        self.cards = array('B', DECK * decks)
+        self.cut_card = int(len(self.cards) * penetration)
+        self.position = 0
+        self.discarded = 0
+        self.shuffle()
+
+    def __len__(self):
+        return len(self.cards) - self.position
+
+    def __iter__(self):
+        return islice(self.cards, self.position, None)
+
+    @property
+    def needs_shuffle(self):
+        return not self.csm and self.position >= self.cut_card
+
+    @property
+    def true_count(self):
+        '''The running count per deck left to deal.'''
+        return self.running_count * len(DECK) / max(len(self), 1)
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.position = 0
+        self.discarded = 0
+        self.running_count = self.count_system.initial_count(self.decks)
+
+    def save(self):
+        '''The state of the shoe, to deal the same cards again after
+        restore().'''
+        return (
+            self.cards[:], self.position, self.discarded, self.running_count
+        )
+
+    def restore(self, saved):
+        cards, self.position, self.discarded, self.running_count = saved
+        self.cards[:] = cards
+
+    def discard(self):
+        '''Move the cards on the table to the discard tray, or with a
+        continuous shuffling machine back into the shoe.'''
+        if not self.csm:
+            self.discarded = self.position
+            return
+        cards, random = self.cards, self.rng.random
+        undealt = len(cards)
+        while self.position:
+            self.position -= 1
+            i = self.position + int(random() * (undealt - self.position))
+            cards[self.position], cards[i] = cards[i], cards[self.position]
+        self.discarded = 0
+        self.running_count = self.count_system.initial_count(self.decks)
+
+    def shuffle_discards(self):
+        '''Shuffle the discard tray into a new shoe behind the cards
+        still on the table.'''
+        if not self.discarded:
+            raise ValueError("The shoe and its discard tray are empty")
+        tray = self.cards[:self.discarded]
+        self.rng.shuffle(tray)
+        table = self.cards[self.discarded:self.position]
+        self.cards[:] = table + tray
+        self.position = len(table)
+        self.discarded = 0
+        self.running_count = self.count_system.initial_count(
+            self.decks
+        ) + sum(self.weights[code] for code in table)
+
+    def draw(self):
+        if self.position == len(self.cards):
+            self.shuffle_discards()
+        code = self.cards[self.position]
+        self.position += 1
+        self.running_count += self.weights[code]
+        return CARDS[code]
+
+
 class Dealer:
 
-    def __init__(self):
+    def __init__(self, decks=4, penetration=0.75, rng=None, csm=False,
+                 count_system=HI_LO):
         self.hand = None
-        self.cards = self.shuffle_cards()
+        self.cards = Shoe(decks, penetration, rng, csm, count_system)
         self.winner=False
 
     def __str__(self):
         return "Dealer"
 
     def shuffle_cards(self):
-        cards = [
-            Card(suit, value)
-            for _ in range(4)
-            for suit in ['Clubs', 'Diamonds', 'Spades', 'Hearts']
-            for value in [
-                2, 3, 4, 5, 6, 7, 8, 9, 10, 'Jack', 'Queen', 'King', 'Ace'
-            ]
-        ]
-        shuffle(cards)
-        return cards
+        self.cards.shuffle()
+        return self.cards
 
-    def deal(self, player_move=None, initial_hand=False):
+    def deal(self, player_move=None, initial_hand=False, seats=1):
         if initial_hand:
-            dealt_cards = [self.cards.pop(0) for _ in range(4)]
-            dealer_hand = Hand([dealt_cards[1], dealt_cards[3]])
-            player_hand = Hand([dealt_cards[0], dealt_cards[2]])
-            return (player_hand, dealer_hand)
+            dealt_cards = [self.cards.draw() for _ in range(2 * (seats + 1))]
+            player_hands = [
+                Hand(dealt_cards[seat::seats + 1]) for seat in range(seats)
+            ]
+            dealer_hand = Hand(dealt_cards[seats::seats + 1])
+            return (*player_hands, dealer_hand)
 
         if player_move == "HIT" or player_move == "DOUBLE DOWN":
-            dealt_cards = self.cards.pop(0)
+            dealt_cards = self.cards.draw()
         elif player_move == "SPLIT":
-            dealt_cards = [self.cards.pop(0) for _ in range(2)]
+            dealt_cards = [self.cards.draw() for _ in range(2)]
         return dealt_cards
 
     def check_hand(self):
         card = self.deal(player_move="HIT")
-        self.hand.cards.append(card)
+        self.hand.append(card)
         return self.hand
@@ -0,0 +1,206 @@
+from argparse import ArgumentParser
+from random import Random
+
+from cache import TableCache
+from classes import DECK, VALUES, Bot, Dealer
+from engine import bet_ramp, clear_table, flat_bet, mimic_dealer, play_round
+from stats import Z_95, Aggregator
+from strategy import basic_strategy
+
+
+BANKROLL = 10 ** 12
+CHECK_EVERY = 1000
+MIN_ROUNDS = 10000
+# Every two to nine swapped with its mirror rank: 2-9, 3-8, 4-7, 5-6.
+MIRROR = bytes.maketrans(DECK, bytes(
+    code - code % len(VALUES) + 7 - code % len(VALUES)
+    if code % len(VALUES) < 8 else code
+    for code in DECK
+))
+
+
+def mimic_policy(decks):
+    return mimic_dealer
+
+
+def basic_policy(decks):
+    return basic_strategy(decks, cache=TableCache()).move
+
+
+POLICIES = {"mimic-dealer": mimic_policy, "basic": basic_policy}
+
+
+class Mirror:
+    '''An rng dealing the antithetic twin of every shoe `rng` deals:
+    each order with its low cards swapped for MIRROR's high ones. The
+    swap keeps the composition of the shoe, so the twin is as likely an
+    order as the original, but small-card-rich shoes become rich in
+    nines and eights. Only full shoes of `decks` decks are mirrored: a
+    discard tray reshuffled mid-round keeps the cards it holds.'''
+
+    def __init__(self, rng, decks):
+        self.rng = rng
+        self.shoe_size = len(DECK) * decks
+
+    def shuffle(self, cards):
+        self.rng.shuffle(cards)
+        if len(cards) == self.shoe_size:
+            memoryview(cards)[:] = bytes(cards).translate(MIRROR)
+
+    def random(self):
+        return self.rng.random()
+
+
+class Stream:
+    '''One dealer playing every policy's round from the same cards:
+    the shoe is saved before the round, restored for each policy after
+    the first and left where the first policy's round ended.'''
+
+    def __init__(self, move_strategies, rng, decks, penetration, bet, ramp,
+                 csm):
+        self.dealer = Dealer(decks, penetration, rng, csm)
+        self.players = [
+            Bot(
+                bet_ramp(self.dealer.cards, ramp, bet) if ramp
+                else flat_bet(bet),
+                move_strategy, chips=BANKROLL
+            )
+            for move_strategy in move_strategies
+        ]
+
+    def play_round(self):
+        '''The net result of each policy's play of the next round.'''
+        shoe = self.dealer.cards
+        start = shoe.save()
+        nets = []
+        for i, player in enumerate(self.players):
+            if i == 1:
+                end = shoe.save()
+            if i:
+                shoe.restore(start)
+            play_round(player, self.dealer)
+            nets.append(player.chips - BANKROLL)
+            player.chips = BANKROLL
+        if len(self.players) > 1:
+            shoe.restore(end)
+        clear_table(self.players, self.dealer)
+        return nets
+
+
+def significant(differences, z):
+    return all(
+        low > 0 or high < 0
+        for low, high in (
+            difference.confidence_interval(z) for difference in differences
+        )
+    )
+
+
+def compare(move_strategies, rounds, seed=0, bet=10, ramp=None, decks=4,
+            penetration=0.75, csm=False, antithetic=False, z=Z_95,
+            min_rounds=MIN_ROUNDS, check_every=CHECK_EVERY):
+    '''Play up to `rounds` rounds of each of `move_strategies` on common
+    random numbers and return the paired difference of each strategy
+    after the first against the first.
+
+    Every policy plays every round from the same shoe, which moves on
+    by the cards the first policy used, so the others are measured on
+    the shoe depths and counts the first one reaches. Bets are flat
+    `bet` chips or, with `ramp`, a bet_ramp() of `bet` chip units on the
+    shoe. With `antithetic` each round is also played on the Mirror of
+    the shoe and the two results averaged.
+
+    From `min_rounds` on, the comparison stops early every `check_every`
+    rounds once the `z` interval of every difference excludes zero.
+    Peeking this way makes significance easier to reach than a single
+    test at the same `z`, so a larger `z` is the safer choice for close
+    strategies.'''
+    if len(move_strategies) < 2:
+        raise ValueError("Comparing strategies needs at least two")
+    rngs = [Random(seed)]
+    if antithetic:
+        rngs.append(Mirror(Random(seed), decks))
+    streams = [
+        Stream(move_strategies, rng, decks, penetration, bet, ramp, csm)
+        for rng in rngs
+    ]
+    results = [Aggregator() for _ in move_strategies]
+    differences = [Aggregator() for _ in move_strategies[1:]]
+    played = 0
+    while played < rounds:
+        nets = [0.0] * len(move_strategies)
+        for stream in streams:
+            for i, net in enumerate(stream.play_round()):
+                nets[i] += net / len(streams)
+        for result, net in zip(results, nets):
+            result.add(net)
+        for difference, net in zip(differences, nets[1:]):
+            difference.add(net - nets[0])
+        played += 1
+        if (
+            played >= min_rounds and played % check_every == 0
+            and significant(differences, z)
+        ):
+            break
+    return {
+        "rounds": played,
+        "significant": significant(differences, z),
+        "strategies": [result.snapshot() for result in results],
+        "differences": [
+            {
+                **difference.snapshot(),
+                "confidence_interval": difference.confidence_interval(z),
+                "efficiency": (
+                    (results[0].variance + result.variance)
+                    / difference.variance
+                ) if difference.variance else float("inf")
+            }
+            for difference, result in zip(differences, results[1:])
+        ]
+    }
+
+
+def main():
+    parser = ArgumentParser(
+        description="Compare blackjack strategies on common random numbers"
+    )
+    parser.add_argument("strategies", nargs="+", choices=sorted(POLICIES))
+    parser.add_argument("--rounds", type=int, default=10 ** 6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--decks", type=int, default=4)
+    parser.add_argument("--penetration", type=float, default=0.75)
+    parser.add_argument("--bet", type=int, default=10)
+    parser.add_argument("--z", type=float, default=Z_95)
+    parser.add_argument(
+        "--antithetic", action="store_true",
+        help="also play every round on the mirrored shoe"
+    )
+    parser.add_argument(
+        "--csm", action="store_true",
+        help="deal from a continuous shuffling machine"
+    )
+    args = parser.parse_args()
+    results = compare(
+        [POLICIES[name](args.decks) for name in args.strategies],
+        args.rounds, args.seed, args.bet, decks=args.decks,
+        penetration=args.penetration, csm=args.csm,
+        antithetic=args.antithetic, z=args.z
+    )
+    print(f"rounds: {results['rounds']}")
+    for name, result in zip(args.strategies, results["strategies"]):
+        print(f"{name}: EV per round {result['mean'] / args.bet:.4f}")
+    for name, difference in zip(args.strategies[1:], results["differences"]):
+        low, high = difference["confidence_interval"]
+        print(
+            f"{name} - {args.strategies[0]}: "
+            f"{difference['mean'] / args.bet:+.4f} per round "
+            f"(CI {low / args.bet:+.4f} to {high / args.bet:+.4f}, "
+            f"{difference['efficiency']:.1f}x fewer rounds than "
+            f"independent shoes)"
+        )
+    if not results["significant"]:
+        print("No significant difference yet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from functools import partial
+
+from classes import Hand
+from exceptions import BetError, TableError
+
+
+MAX_SEATS = 7
+
+
+class Table:
+    '''Up to MAX_SEATS players playing against one dealer and shoe.
+    Every round is written to `log`, a history.HandLog, if one is
+    given. With `rules`, a rules.Rules, rounds are played by the round
+    compiled from it and every seat must be a Bot.'''
+
+    def __init__(self, dealer, players=(), log=None, rules=None):
+        self.dealer = dealer
+        self.log = log
+        self.round = rules.compile() if rules is not None else None
+        self.players = []
+        for player in players:
+            self.sit(player)
+
+    def sit(self, player):
+        if len(self.players) == MAX_SEATS:
+            raise TableError(f"The table already has {MAX_SEATS} players")
+        self.players.append(player)
+
+    def leave(self, player):
+        self.players.remove(player)
+
+    def play_round(self):
+        if self.round is None:
+            play_table_round(self.players, self.dealer)
+        else:
+            self.round.play_table_round(self.players, self.dealer)
+        if self.log is not None:
+            self.log.write(self.players, self.dealer)
+
+    def next_round(self):
+        clear_table(self.players, self.dealer)
+
+
+def play_round(player, dealer):
+    play_table_round([player], dealer)
+    return player, dealer
+
+
+def play_table_round(players, dealer):
+    bets = [player.bet() for player in players]
+    deal_hands(players, dealer, bets)
+    for player in players:
+        play_hands(player, dealer)
+    play_dealer(players, dealer)
+    settle(players, dealer)
+
+
+def deal_hands(players, dealer, bets):
+    '''Deal a card to each seat in turn and then the dealer, twice.'''
+    *player_hands, dealer.hand = dealer.deal(
+        initial_hand=True, seats=len(players)
+    )
+    for player, player_hand, bet in zip(players, player_hands, bets):
+        player_hand.bet = bet
+        player.collect_hand(player_hand)
+
+
+def play_hands(player, dealer):
+    i = 0
+    while i < len(player.hands):
+        player_move = player.check_hand(player.hands[i], dealer.hand)
+        i = play_move(player, dealer, i, player_move)
+    return player_move
+
+
+def play_move(player, dealer, i, player_move):
+    '''Carry out a move on the player's i-th hand and return the index
+    of the hand to play next.'''
+    if player_move == "STAND":
+        player.hands[i].moves.append(player_move)
+        i += 1
+    elif player_move == "DOUBLE DOWN":
+        card = dealer.deal(player_move)
+        player.hands[i].append(card)
+        player.hands[i].moves.append(player_move)
+        player.hands[i].bet *= 2
+        i += 1
+    elif player_move == "SPLIT":
+        split_hand = player.hands.pop(i)
+        dealt_cards = dealer.deal(player_move)
+        for x in range(2):
+            hand = Hand([split_hand.cards[x], dealt_cards[x]])
+            hand.split = True
+            hand.bet = split_hand.bet
+            hand.moves = split_hand.moves + [player_move]
+            player.hands.insert(i + x, hand)
+    elif player_move == "HIT":
+        card = dealer.deal(player_move)
+        player.hands[i].append(card)
+        player.hands[i].moves.append(player_move)
+    elif player_move == "SURRENDER":
+        player.hands[i].surrender = True
+        player.hands[i].moves.append(player_move)
+        i += 1
+    else:
+        player.hands[i].bust = True
+        i += 1
+    return i
+
+
+def play_dealer(players, dealer):
+    '''The dealer draws to 17 once for the whole table, unless every
+    hand at it is bust.'''
+    if any(not hand.bust for player in players for hand in player.hands):
+        while dealer.hand.value < 17:
+            dealer.check_hand()
+
+
+def settle(players, dealer):
+    '''Pay every hand at the table against the dealer in one pass. A
+    winning hand is paid its own bet, a push is returned its bet.'''
+    dealer_value = 0 if dealer.hand.bust else dealer.hand.value
+    dealer.winner = False
+    for player in players:
+        for hand in player.hands:
+            if hand.bust or hand.value < dealer_value:
+                dealer.winner = True
+                hand.payout = 0
+            elif hand.value > dealer_value:
+                hand.win = True
+                hand.payout = 2 * hand.bet
+            else:
+                hand.push = True
+                hand.payout = hand.bet
+            player.chips += hand.payout
+        player.winner = any(hand.win for hand in player.hands)
+        player.placed_bet = 0
+
+
+def next_round(player, dealer):
+    clear_table([player], dealer)
+
+
+def clear_table(players, dealer):
+    for player in players:
+        player.winner = False
+        player.hands = []
+        player.placed_bet = 0
+    dealer.winner = False
+    dealer.hand = None
+    dealer.cards.discard()
+    if dealer.cards.needs_shuffle:
+        dealer.shuffle_cards()
+
+
+def play_rounds(player, dealer, rounds):
+    played = 0
+    while played < rounds:
+        try:
+            play_round(player, dealer)
+        except BetError:
+            break
+        next_round(player, dealer)
+        played += 1
+    return played
+
+
+def bet_amount(amount, player):
+    return amount
+
+
+def flat_bet(amount=10):
+    return partial(bet_amount, amount)
+
+
+def ramp_amount(shoe, ramp, unit, player):
+    true_count = int(shoe.true_count)
+    units = ramp[min(max(true_count, 0), len(ramp) - 1)]
+    return min(unit * units, player.chips)
+
+
+def bet_ramp(shoe, ramp=(1, 1, 2, 4, 8), unit=10):
+    '''Bet ramp[true count] units of `unit` chips, reading the true count
+    of `shoe` as it is when the bet is placed. Counts below zero bet
+    ramp[0] and counts past the end of the ramp bet its last entry.'''
+    return partial(ramp_amount, shoe, ramp, unit)
+
+
+def mimic_dealer(player_hand, dealer_hand, moves):
+    return "HIT" if player_hand.value < 17 else "STAND"
@@ -1,3 +1,18 @@
 
 class BetError(Exception):
     pass
+
+
+class MoveError(Exception):
+    pass
+
+
+class TableError(Exception):
+    pass
+
+
+class ReplayError(Exception):
+
+    def __init__(self, round, message):
+        super().__init__(f"Round {round}: {message}")
+        self.round = round
@@ -1,11 +1,56 @@
-
-import os
+import sys
 from time import sleep
 
 
-def cls():
-    sleep(2)
-    os.system('cls' if os.name == 'nt' else 'clear')
+DELAY = 2
+
+
+class Screen:
+    '''The terminal redrawn in place with ANSI cursor control.
+
+    draw() shows a screen of text, rewriting only the lines that differ
+    from the screen already shown and clearing whatever was printed
+    below it since. `delay` is how many seconds a message stays up
+    before the game moves on; 0 never pauses.'''
+
+    def __init__(self, stream=None, delay=DELAY):
+        self.stream = stream
+        self.delay = delay
+        self.lines = None
+
+    def write(self, text):
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+    def draw(self, text):
+        lines = str(text).split("\n")
+        output = []
+        if self.lines is None:
+            output.append("\x1b[H\x1b[2J")
+            self.lines = []
+        for row, line in enumerate(lines):
+            if row >= len(self.lines) or self.lines[row] != line:
+                output.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+        output.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+        self.lines = lines
+        self.write("".join(output))
+
+    def message(self, text):
+        '''Show `text` below the screen until the next draw.'''
+        self.write(f"{text}\n")
+        self.pause()
+
+    def pause(self):
+        if self.delay:
+            sleep(self.delay)
+
+    def clear(self):
+        self.lines = []
+        self.write("\x1b[H\x1b[2J")
+
+
+screen = Screen()
 
 
 def show_player_stats(func):
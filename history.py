@@ -0,0 +1,196 @@
+import mmap
+import os
+import struct
+
+from collections import namedtuple
+
+from classes import CARDS, Hand
+
+
+CARD_SLOTS = 16
+RECORD = struct.Struct(f"<QQBBBBBB{CARD_SLOTS}s{CARD_SLOTS}s{CARD_SLOTS}sqq")
+MOVE_CODES = {
+    "STAND": 1, "HIT": 2, "DOUBLE DOWN": 3, "SPLIT": 4, "SURRENDER": 5
+}
+MOVE_NAMES = {code: move for move, code in MOVE_CODES.items()}
+SPLIT, DOUBLE_DOWN, WIN, PUSH, BUST, SESSION, SURRENDER = (
+    1 << i for i in range(7)
+)
+FLUSH_RECORDS = 4096
+
+
+class HandRecord(namedtuple("HandRecord", (
+    "round", "seed", "seat", "hand", "flags", "bet", "payout",
+    "cards", "moves", "dealer_cards"
+))):
+    '''One logged hand. Cards are card codes (indices into CARDS) and
+    moves are MOVE_CODES, both as bytes in the order they happened. The
+    SESSION flag marks the rounds a new shoe was seeded for.'''
+
+    __slots__ = ()
+
+    @property
+    def net(self):
+        return self.payout - self.bet
+
+    def move_names(self):
+        return [MOVE_NAMES[code] for code in self.moves]
+
+    def hands(self):
+        '''The player's and the dealer's hand rebuilt from the record.'''
+        return (
+            Hand([CARDS[code] for code in self.cards]),
+            Hand([CARDS[code] for code in self.dealer_cards])
+        )
+
+
+def hand_flags(hand):
+    return (
+        SPLIT * hand.split | DOUBLE_DOWN * hand.double_down
+        | WIN * hand.win | PUSH * hand.push | BUST * hand.bust
+        | SURRENDER * hand.surrender
+    )
+
+
+def payout(hand):
+    if hand.payout is not None:
+        return hand.payout
+    if hand.win:
+        return 2 * hand.bet
+    return hand.bet if hand.push else 0
+
+
+def hand_record(round, seed, seat, i, hand, dealer_cards, flags=0):
+    return HandRecord(
+        round, seed, seat, i, flags | hand_flags(hand), hand.bet,
+        payout(hand), bytes(card.code for card in hand.cards),
+        bytes(MOVE_CODES[move] for move in hand.moves), dealer_cards
+    )
+
+
+def pack_into(buffer, offset, record):
+    RECORD.pack_into(
+        buffer, offset, record.round, record.seed, record.seat,
+        record.hand, len(record.cards), len(record.moves),
+        len(record.dealer_cards), record.flags, record.cards, record.moves,
+        record.dealer_cards, record.bet, record.payout
+    )
+
+
+def unpack(fields):
+    (
+        round, seed, seat, hand, n_cards, n_moves, n_dealer, flags,
+        cards, moves, dealer_cards, bet, paid
+    ) = fields
+    return HandRecord(
+        round, seed, seat, hand, flags, bet, paid, cards[:n_cards],
+        moves[:n_moves], dealer_cards[:n_dealer]
+    )
+
+
+class HandLog:
+    '''Appends a fixed-width RECORD for every hand played to a binary
+    file. Records are packed into a buffer and written to the file as
+    soon as `flush_records` of them are pending. Round numbers carry on
+    from the last record already in the file and the first round
+    written is flagged SESSION. A damaged log raises ValueError before
+    the file is opened for writing.'''
+
+    def __init__(self, path, seed=0, flush_records=FLUSH_RECORDS):
+        self.seed = seed
+        self.rounds = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            with HandLogReader(path) as reader:
+                self.rounds = reader[-1].round + 1
+        self.file = open(path, "ab")
+        self.session = self.rounds
+        self.capacity = flush_records
+        self.buffer = bytearray(RECORD.size * flush_records)
+        self.pending = 0
+
+    def write(self, players, dealer):
+        '''Log every hand at the table once the round is settled.'''
+        dealer_cards = bytes(card.code for card in dealer.hand.cards)
+        hands = [hand for player in players for hand in player.hands]
+        longest = max(len(hand.cards) for hand in [dealer.hand, *hands])
+        if longest > CARD_SLOTS:
+            raise ValueError(
+                f"Only {CARD_SLOTS} cards of a hand can be logged"
+            )
+        flags = SESSION if self.rounds == self.session else 0
+        for seat, player in enumerate(players):
+            for i, hand in enumerate(player.hands):
+                pack_into(
+                    self.buffer, self.pending * RECORD.size, hand_record(
+                        self.rounds, self.seed, seat, i, hand, dealer_cards,
+                        flags
+                    )
+                )
+                self.pending += 1
+                if self.pending == self.capacity:
+                    self.flush()
+        self.rounds += 1
+
+    def flush(self):
+        self.file.write(memoryview(self.buffer)[:self.pending * RECORD.size])
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class HandLogReader:
+    '''The records of a hand log read in place through a memory map, so
+    a log of any size is scanned without loading it. Iterating yields
+    HandRecords; raw() yields the unpacked fields without building
+    them.'''
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size % RECORD.size:
+                raise ValueError(
+                    f"{path} is not a whole number of {RECORD.size} byte "
+                    "records"
+                )
+            self.map = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if size else None
+            )
+        self.view = memoryview(self.map if size else b"")
+
+    def __len__(self):
+        return len(self.view) // RECORD.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Record index out of range")
+        return unpack(RECORD.unpack_from(self.view, i * RECORD.size))
+
+    def __iter__(self):
+        return map(unpack, self.raw())
+
+    def raw(self):
+        return RECORD.iter_unpack(self.view)
+
+    def close(self):
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,177 @@
+import json
+import signal
+import sys
+
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from threading import Event, Thread
+from time import perf_counter
+
+import classes
+import engine
+import rules
+
+
+PHASES = {
+    engine: (
+        "play_round", "play_table_round", "deal_hands", "play_hands",
+        "play_dealer", "settle", "next_round", "clear_table"
+    ),
+}
+METHODS = {
+    classes.Player: ("bet", "check_hand", "place_bet", "legal_moves"),
+    classes.Bot: ("bet", "check_hand"),
+    classes.Dealer: ("deal", "check_hand", "shuffle_cards"),
+    rules.Round: ("play_round", "play_table_round", "play_hands", "settle"),
+}
+PERCENTILES = (50, 90, 99)
+_originals = []
+
+
+class Timing:
+    '''The call count, total time and most recent samples of one
+    instrumented phase or method.'''
+
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def summary(self):
+        summary = {
+            "count": self.count, "total_ms": self.total * 1e3,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0
+        }
+        ordered = sorted(self.samples)
+        for percentile in PERCENTILES:
+            summary[f"p{percentile}_us"] = (
+                ordered[(len(ordered) - 1) * percentile // 100] * 1e6
+                if ordered else 0.0
+            )
+        return summary
+
+
+class Recorder:
+    '''Collects the timings of instrumented calls. Percentiles are taken
+    over the last `samples` calls of each name.'''
+
+    def __init__(self, samples=1024):
+        self.sample_size = samples
+        self.timings = {}
+        self.stopped = None
+
+    def record(self, name, seconds):
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing(self.sample_size)
+        timing.add(seconds)
+
+    def snapshot(self):
+        return {
+            name: timing.summary()
+            for name, timing in sorted(self.timings.items())
+        }
+
+    def report(self, format="text"):
+        snapshot = self.snapshot()
+        if format == "json":
+            return json.dumps(snapshot)
+        lines = [
+            f"{'name':<22}{'count':>10}{'total ms':>12}{'mean us':>10}"
+            + "".join(f"{f'p{p} us':>10}" for p in PERCENTILES)
+        ]
+        for name, summary in snapshot.items():
+            lines.append(
+                f"{name:<22}{summary['count']:>10}"
+                f"{summary['total_ms']:>12.2f}{summary['mean_us']:>10.2f}"
+                + "".join(
+                    f"{summary[f'p{p}_us']:>10.2f}" for p in PERCENTILES
+                )
+            )
+        return "\n".join(lines)
+
+    def report_every(self, interval, stream=sys.stderr, format="text"):
+        '''Write a report to `stream` every `interval` seconds from a
+        background thread until stop_reporting() is called.'''
+        self.stopped = Event()
+
+        def report():
+            while not self.stopped.wait(interval):
+                print(self.report(format), file=stream, flush=True)
+        Thread(target=report, daemon=True).start()
+
+    def stop_reporting(self):
+        if self.stopped is not None:
+            self.stopped.set()
+
+    def report_on_signal(self, signum=None, stream=sys.stderr,
+                         format="text"):
+        '''Write a report to `stream` whenever the process receives
+        `signum`, by default SIGUSR1 where the platform has it.'''
+        if signum is None:
+            signum = getattr(signal, "SIGUSR1", None)
+            if signum is None:
+                raise ValueError(
+                    "This platform has no SIGUSR1; pass the signal to "
+                    "report on"
+                )
+        signal.signal(
+            signum,
+            lambda *_: print(self.report(format), file=stream, flush=True)
+        )
+
+
+def timed(name, func, recorder):
+    record = recorder.record
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, perf_counter() - start)
+    return wrapper
+
+
+def enable(recorder=None):
+    '''Time every round phase and Player/Dealer/Round method into
+    `recorder`. Until then nothing is wrapped, so instrumentation costs
+    nothing.'''
+    if _originals:
+        raise RuntimeError("Instrumentation is already enabled")
+    recorder = recorder if recorder is not None else Recorder()
+    for module, names in PHASES.items():
+        for name in names:
+            func = getattr(module, name)
+            _originals.append((module, name, func))
+            setattr(module, name, timed(f"round.{name}", func, recorder))
+    for cls, names in METHODS.items():
+        for name in names:
+            func = cls.__dict__[name]
+            _originals.append((cls, name, func))
+            setattr(
+                cls, name, timed(f"{cls.__name__}.{name}", func, recorder)
+            )
+    return recorder
+
+
+def disable():
+    while _originals:
+        owner, name, func = _originals.pop()
+        setattr(owner, name, func)
+
+
+@contextmanager
+def enabled(recorder=None):
+    recorder = enable(recorder)
+    try:
+        yield recorder
+    finally:
+        disable()
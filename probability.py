@@ -0,0 +1,209 @@
+from functools import lru_cache
+
+from classes import CARDS
+
+
+BUST = 22
+OUTCOMES = (17, 18, 19, 20, 21, BUST)
+CACHE_SIZE = 2 ** 16
+PIP_INDEX = tuple(card.pip - 2 for card in CARDS)
+ACE = PIP_INDEX[-1]
+
+
+def composition(codes):
+    '''Count the cards left in a shoe by pip value: the counts of twos
+    through nines, of ten-valued cards and of aces.'''
+    counts = [0] * 10
+    for code in codes:
+        counts[PIP_INDEX[code]] += 1
+    return tuple(counts)
+
+
+def remove(counts, *pips):
+    counts = list(counts)
+    for pip in pips:
+        counts[pip - 2] -= 1
+        if counts[pip - 2] < 0:
+            raise ValueError(f"No card of pip {pip} left in the shoe")
+    return tuple(counts)
+
+
+def stands_on(total, soft_aces, hit_soft_17):
+    return total >= 17 and not (total == 17 and soft_aces and hit_soft_17)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def dealer_outcomes(total, soft_aces, counts, hit_soft_17=False):
+    '''The probabilities of each of OUTCOMES for a dealer holding
+    `total` (with `soft_aces` aces counted as 11) who draws from a shoe
+    of `counts` and stands on 17 or more, or on hard 17 or more if
+    `hit_soft_17`.'''
+    if total > 21:
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+    if stands_on(total, soft_aces, hit_soft_17):
+        outcomes = [0.0] * len(OUTCOMES)
+        outcomes[total - 17] = 1.0
+        return tuple(outcomes)
+    remaining = sum(counts)
+    if not remaining:
+        raise ValueError("The shoe is empty")
+    bust = 0.0
+    outcomes = [0.0] * len(OUTCOMES)
+    for i, count in enumerate(counts):
+        if not count:
+            continue
+        weight = count / remaining
+        next_total = total + i + 2
+        next_aces = soft_aces + (i == ACE)
+        if next_total > 21 and next_aces:
+            next_total -= 10
+            next_aces -= 1
+        if next_total > 21:
+            bust += weight
+        elif stands_on(next_total, next_aces, hit_soft_17):
+            outcomes[next_total - 17] += weight
+        else:
+            drawn = counts[:i] + (count - 1,) + counts[i + 1:]
+            following = dealer_outcomes(
+                next_total, next_aces, drawn, hit_soft_17
+            )
+            for j, p in enumerate(following):
+                outcomes[j] += weight * p
+    outcomes[-1] += bust
+    return tuple(outcomes)
+
+
+def dealer_distribution(up_card, counts, hit_soft_17=False, peek=False):
+    '''The distribution of the dealer's final total given their up-card
+    pip and the composition of the shoe the hole card and any further
+    cards are drawn from. With `peek` the dealer has looked at the hole
+    card and has no natural.'''
+    soft_aces = int(up_card == 11)
+    if not peek or up_card < 10:
+        return dealer_outcomes(up_card, soft_aces, counts, hit_soft_17)
+    outcomes = [0.0] * len(OUTCOMES)
+    no_natural = 0.0
+    for weight, total, aces, drawn in draws(up_card, soft_aces, counts):
+        if total == 21:
+            continue
+        no_natural += weight
+        following = dealer_outcomes(total, aces, drawn, hit_soft_17)
+        for i, p in enumerate(following):
+            outcomes[i] += weight * p
+    return tuple(p / no_natural for p in outcomes)
+
+
+def stand_values(up_card, counts, hit_soft_17=False, peek=False):
+    '''The expected value of standing on each total up to 21 against a
+    dealer showing `up_card` whose hole card is drawn from `counts`. A
+    tie is a push.'''
+    outcomes = dealer_distribution(up_card, counts, hit_soft_17, peek)
+    values = []
+    for total in range(22):
+        won = outcomes[-1] + sum(outcomes[:max(total - 17, 0)])
+        lost = sum(outcomes[max(total - 16, 0):5])
+        values.append(won - lost)
+    return values
+
+
+def draws(total, soft_aces, counts):
+    '''Each card that can be drawn from `counts` as (probability, total,
+    soft aces, counts after the draw).'''
+    remaining = sum(counts)
+    for i, count in enumerate(counts):
+        if not count:
+            continue
+        next_total = total + i + 2
+        next_aces = soft_aces + (i == ACE)
+        if next_total > 21 and next_aces:
+            next_total -= 10
+            next_aces -= 1
+        drawn = counts[:i] + (count - 1,) + counts[i + 1:]
+        yield count / remaining, next_total, next_aces, drawn
+
+
+def hit_value(total, soft_aces, counts, stands, table):
+    '''The expected value of hitting and then playing on optimally.
+
+    Results are kept in `table` keyed on the player's total, soft aces
+    and the number of cards left, so each subtree is searched once.
+    Hands reached by different draws of the same number of cards share
+    an entry; the odds of the next card barely depend on which few
+    cards were drawn.'''
+    key = (total, soft_aces, sum(counts))
+    if key in table:
+        return table[key]
+    value = 0.0
+    for weight, next_total, next_aces, drawn in draws(
+        total, soft_aces, counts
+    ):
+        if next_total > 21:
+            value -= weight
+        else:
+            value += weight * max(
+                stands[next_total],
+                hit_value(next_total, next_aces, drawn, stands, table)
+            )
+    table[key] = value
+    return value
+
+
+def double_value(total, soft_aces, counts, stands):
+    return 2 * sum(
+        weight * (-1 if next_total > 21 else stands[next_total])
+        for weight, next_total, _, _ in draws(total, soft_aces, counts)
+    )
+
+
+def split_value(pip, counts, stands, table, double_after_split=True):
+    value = 0.0
+    for weight, total, soft_aces, drawn in draws(pip, int(pip == 11), counts):
+        best = max(
+            stands[total], hit_value(total, soft_aces, drawn, stands, table)
+        )
+        if double_after_split:
+            best = max(best, double_value(total, soft_aces, drawn, stands))
+        value += weight * best
+    return 2 * value
+
+
+def action_values(player_hand, up_card, counts, moves, hit_soft_17=False,
+                  double_after_split=True, peek=False):
+    '''The expected value of each move in `moves`, per chip of the
+    hand's bet. The dealer's chances are taken from the shoe as it is
+    when the decision is made; they hit soft 17 if `hit_soft_17` and,
+    with `peek`, are known not to hold a natural, though the player's
+    cards are still drawn from the whole shoe. Split hands are split no
+    further but may be doubled if `double_after_split`.'''
+    stands = stand_values(up_card, counts, hit_soft_17, peek)
+    table = {}
+    total, soft_aces = player_hand.value, player_hand.soft_aces
+    values = {}
+    for move in moves:
+        if move == "STAND":
+            values[move] = stands[total]
+        elif move == "HIT":
+            values[move] = hit_value(total, soft_aces, counts, stands, table)
+        elif move == "DOUBLE DOWN":
+            values[move] = double_value(total, soft_aces, counts, stands)
+        elif move == "SPLIT":
+            values[move] = split_value(
+                player_hand.cards[0].pip, counts, stands, table,
+                double_after_split
+            )
+    return values
+
+
+class Advisor:
+    '''Values the moves of a hand against the cards left in a shoe.'''
+
+    def __init__(self, shoe):
+        self.shoe = shoe
+
+    def action_values(self, player_hand, dealer_hand, moves):
+        counts = list(composition(self.shoe))
+        for card in dealer_hand.cards[1:]:
+            counts[card.pip - 2] += 1
+        return action_values(
+            player_hand, dealer_hand.cards[0].pip, tuple(counts), moves
+        )
@@ -0,0 +1,106 @@
+from argparse import ArgumentParser
+from itertools import groupby, zip_longest
+from operator import attrgetter
+from random import Random
+from sys import exit
+
+from classes import Bot, Dealer
+from engine import clear_table, play_table_round
+from exceptions import BetError, MoveError, ReplayError
+from history import (
+    DOUBLE_DOWN, MOVE_NAMES, SESSION, HandLogReader, hand_record
+)
+from simulation import BANKROLL
+
+
+class ReplaySeat(Bot):
+    '''A seat whose bet and moves are read from the records of the hands
+    it played in a logged round.'''
+
+    def __init__(self):
+        super().__init__(self.logged_bet, self.logged_move, chips=BANKROLL)
+        self.records = []
+
+    def logged_bet(self, player):
+        first = self.records[0]
+        return first.bet // 2 if first.flags & DOUBLE_DOWN else first.bet
+
+    def logged_move(self, player_hand, dealer_hand, moves):
+        # Hands left of the one in play are finished, so the hand at
+        # index i is, or will split into, the i-th logged hand.
+        i = next(
+            i for i, hand in enumerate(self.hands) if hand is player_hand
+        )
+        if i >= len(self.records):
+            raise MoveError(f"Hand {i} was not logged")
+        logged = self.records[i].moves
+        played = len(player_hand.moves)
+        if played == len(logged):
+            raise MoveError(f"No move was logged for {player_hand}")
+        return MOVE_NAMES[logged[played]]
+
+
+def replay(records, decks=4, penetration=0.75):
+    '''Play logged rounds again from the seed of their shoe and the
+    logged bets and moves, and return how many were replayed. A new shoe
+    is seeded at the start of every logged session; it must have the
+    `decks` and `penetration` the rounds were played with.
+
+    Raises ReplayError for the first round that does not deal, play and
+    pay out exactly as it was logged.'''
+    dealer = None
+    seats = []
+    replayed = 0
+    for round, logged in groupby(records, attrgetter("round")):
+        logged = list(logged)
+        seed = logged[0].seed
+        if dealer is None or logged[0].flags & SESSION:
+            dealer = Dealer(decks, penetration, Random(seed))
+        while len(seats) <= logged[-1].seat:
+            seats.append(ReplaySeat())
+        table = seats[:logged[-1].seat + 1]
+        for seat in table:
+            seat.records = []
+        for record in logged:
+            table[record.seat].records.append(record)
+        try:
+            play_table_round(table, dealer)
+        except (BetError, MoveError) as e:
+            raise ReplayError(round, str(e)) from e
+        dealer_cards = bytes(card.code for card in dealer.hand.cards)
+        flags = logged[0].flags & SESSION
+        played = [
+            hand_record(round, seed, s, i, hand, dealer_cards, flags)
+            for s, seat in enumerate(table)
+            for i, hand in enumerate(seat.hands)
+        ]
+        if played != logged:
+            expected, actual = next(
+                pair for pair in zip_longest(logged, played)
+                if pair[0] != pair[1]
+            )
+            raise ReplayError(
+                round, f"logged {expected} but replayed {actual}"
+            )
+        clear_table(table, dealer)
+        replayed += 1
+    return replayed
+
+
+def main():
+    parser = ArgumentParser(description="Replay and verify a hand log")
+    parser.add_argument("path", help="hand log written by history.HandLog")
+    parser.add_argument("--decks", type=int, default=4)
+    parser.add_argument("--penetration", type=float, default=0.75)
+    args = parser.parse_args()
+    with HandLogReader(args.path) as reader:
+        try:
+            rounds = replay(reader, args.decks, args.penetration)
+        except ReplayError as e:
+            print(f"Diverged at {e}")
+            exit(1)
+    print(f"Replayed {rounds} rounds as logged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+from argparse import ArgumentParser
+from math import ceil
+from random import Random
+
+import numpy as np
+
+from classes import Bot, Dealer
+from engine import flat_bet, mimic_dealer, next_round, play_round
+
+
+MIN_BET = 10
+MAX_STACKS = 10 ** 7
+
+
+def outcome_distribution(rounds=100000, move_strategy=mimic_dealer, seed=0,
+                         decks=4, penetration=0.75):
+    '''The probability of each net result of a round, in bets, estimated
+    from `rounds` headless rounds played at a flat bet.'''
+    player = Bot(flat_bet(MIN_BET), move_strategy, chips=10 ** 12)
+    dealer = Dealer(decks, penetration, Random(seed))
+    counts = {}
+    for _ in range(rounds):
+        chips = player.chips
+        play_round(player, dealer)
+        net = (player.chips - chips) / MIN_BET
+        counts[net] = counts.get(net, 0) + 1
+        next_round(player, dealer)
+    return {net: n / rounds for net, n in sorted(counts.items())}
+
+
+def bet_sizes(bet, top, min_bet=MIN_BET):
+    '''The bet at each stack from 0 to `top`: `bet` is a number of chips
+    or a function of the stack. No bet is more than the stack and stacks
+    below `min_bet` bet nothing.'''
+    stacks = np.arange(top + 1)
+    if callable(bet):
+        bets = np.array([bet(stack) for stack in range(top + 1)])
+    else:
+        bets = np.full(top + 1, bet)
+    return np.where(stacks < min_bet, 0, np.minimum(bets, stacks))
+
+
+class Lattice:
+    '''The stacks from 0 to `top` a session starting at `chips` can
+    reach, as multiples of the chip unit every result is a multiple of,
+    with the bet at each and the index of the stack each outcome leads
+    to. A loss larger than the stack leaves 0 chips.'''
+
+    def __init__(self, chips, outcomes, bet, top, min_bet=MIN_BET):
+        bets = bet_sizes(bet, top, min_bet)
+        self.nets = np.array(list(outcomes), dtype=float)
+        self.probabilities = np.array(list(outcomes.values()))
+        deltas = np.rint(np.multiply.outer(self.nets, bets)).astype(np.int64)
+        self.unit = int(np.gcd.reduce(np.append(deltas.ravel(), chips)))
+        self.stacks = np.arange(0, top + 1, self.unit)
+        self.bets = bets[::self.unit]
+        steps = deltas[:, ::self.unit] // self.unit
+        self.destinations = np.clip(
+            np.arange(len(self.stacks)) + steps, 0, len(self.stacks) - 1
+        )
+        self.start = chips // self.unit
+
+
+def ceiling(chips, outcomes, bet, rounds, target, min_bet=MIN_BET):
+    '''The largest stack a session can reach: one round's biggest win
+    past the target or, with no target, `rounds` of them past `chips`.'''
+    gain = max(max(outcomes), 0)
+    if target is not None:
+        top = max(chips, target + ceil(
+            gain * bet_sizes(bet, target, min_bet).max()
+        ))
+    else:
+        top = chips
+        while True:
+            limit = chips + rounds * ceil(
+                gain * bet_sizes(bet, top, min_bet).max()
+            )
+            if limit <= top or limit > MAX_STACKS:
+                top = max(top, limit)
+                break
+            top = limit
+    if top > MAX_STACKS:
+        raise ValueError("The bet policy grows too fast to bound the stack")
+    return top
+
+
+def session_lengths(chips, outcomes, rounds, bet=MIN_BET, target=None,
+                    min_bet=MIN_BET):
+    '''The exact distribution of how a session of at most `rounds` rounds
+    ends, starting from `chips` and betting `bet` (chips or a function of
+    the stack) while the stack is at least `min_bet` and below `target`.
+
+    `outcomes` maps each net result of a round, in bets, to its
+    probability. Results are the chance of ruin and of reaching the
+    target in each round, the chance of still playing after `rounds`,
+    and the expected rounds played, chips wagered and final stack.'''
+    lattice = Lattice(chips, outcomes, bet, ceiling(
+        chips, outcomes, bet, rounds, target, min_bet
+    ), min_bet)
+    stacks = lattice.stacks
+    ruined = stacks < min_bet
+    won = stacks >= target if target is not None else np.zeros_like(ruined)
+    active = ~(ruined | won)
+    playing = np.zeros(len(stacks))
+    ended = np.zeros(len(stacks))
+    if active[lattice.start]:
+        playing[lattice.start] = 1.0
+    else:
+        ended[lattice.start] = 1.0
+    ruin_by_round = np.zeros(rounds)
+    target_by_round = np.zeros(rounds)
+    expected_rounds = expected_wagered = 0.0
+    low, high = lattice.start, lattice.start + 1
+    for played in range(rounds):
+        mass = playing[low:high]
+        expected_rounds += mass.sum()
+        expected_wagered += mass @ lattice.bets[low:high]
+        new_low = int(lattice.destinations[:, low:high].min())
+        new_high = int(lattice.destinations[:, low:high].max()) + 1
+        moved = np.zeros(new_high - new_low)
+        for destinations, p in zip(
+            lattice.destinations, lattice.probabilities
+        ):
+            moved += np.bincount(
+                destinations[low:high] - new_low, mass * p,
+                new_high - new_low
+            )
+        playing[low:high] = 0.0
+        window = slice(new_low, new_high)
+        ruin_by_round[played] = moved[ruined[window]].sum()
+        target_by_round[played] = moved[won[window]].sum()
+        ended[window] += np.where(active[window], 0.0, moved)
+        playing[window] = np.where(active[window], moved, 0.0)
+        low, high = new_low, new_high
+    expected_final = (ended + playing) @ stacks
+    return {
+        "ruin": ended[ruined].sum(),
+        "target": ended[won].sum(),
+        "playing": playing.sum(),
+        "ruin_by_round": ruin_by_round,
+        "target_by_round": target_by_round,
+        "expected_rounds": expected_rounds,
+        "expected_wagered": expected_wagered,
+        "expected_final": expected_final,
+        "hold": (chips - expected_final) / expected_wagered
+        if expected_wagered else 0.0
+    }
+
+
+def solve_banded(band, lower, upper, b):
+    '''Solve A x = b for the banded matrix whose diagonal is
+    band[:, lower], with `lower` diagonals below it and `upper` above.
+    Gaussian elimination without pivoting, which is stable for the
+    diagonally dominant I - Q of an absorbing chain.'''
+    band, b = band.copy(), b.copy()
+    n = len(band)
+    columns = np.arange(upper + 1)
+    for k in range(n - 1):
+        d = min(lower, n - 1 - k)
+        rows = np.arange(k + 1, k + 1 + d)
+        below = lower - 1 - np.arange(d)
+        factors = band[rows, below] / band[k, lower]
+        band[rows[:, None], below[:, None] + columns] -= (
+            factors[:, None] * band[k, lower:]
+        )
+        b[rows] -= factors[:, None] * b[k]
+    x = np.zeros_like(b)
+    for k in range(n - 1, -1, -1):
+        e = min(upper, n - 1 - k)
+        x[k] = (
+            b[k] - band[k, lower + 1:lower + 1 + e] @ x[k + 1:k + 1 + e]
+        ) / band[k, lower]
+    return x
+
+
+def absorption(lattice, transient, min_bet):
+    '''For each of the `transient` stacks of `lattice`, the chance of
+    ruin and the expected rounds played, chips wagered and final stack
+    until the session ends.'''
+    stacks = lattice.stacks
+    first, n = transient[0], len(transient)
+    steps = lattice.destinations[:, transient] - transient
+    lower, upper = max(-steps.min(), 0), max(steps.max(), 0)
+    band = np.zeros((n, lower + upper + 1))
+    band[:, lower] = 1.0
+    b = np.zeros((n, 4))
+    b[:, 1] = 1.0
+    b[:, 2] = lattice.bets[transient]
+    rows = np.arange(n)
+    for destinations, p in zip(lattice.destinations, lattice.probabilities):
+        j = destinations[transient] - first
+        inside = (j >= 0) & (j < n)
+        band[rows[inside], lower + j[inside] - rows[inside]] -= p
+        outside = destinations[transient][~inside]
+        b[~inside, 0] += p * (stacks[outside] < min_bet)
+        b[~inside, 3] += p * stacks[outside]
+    return solve_banded(band, lower, upper, b)
+
+
+def risk_of_ruin(chips, outcomes, target, bet=MIN_BET, min_bet=MIN_BET):
+    '''The exact chance of ruin before the stack reaches `target`, with
+    the expected rounds played, chips wagered and final stack, for a
+    session starting at `chips` and betting as for session_lengths().
+    "ruin_by_stack" holds the chance of ruin from every stack. A session
+    starting below `min_bet` or at `target` or more plays no round.
+
+    The absorbing chain is solved directly, so there is no horizon; the
+    work grows with the number of stacks times the spread of results.'''
+    lattice = Lattice(chips, outcomes, bet, ceiling(
+        chips, outcomes, bet, 0, target, min_bet
+    ), min_bet)
+    stacks = lattice.stacks
+    transient = np.flatnonzero((stacks >= min_bet) & (stacks < target))
+    ruin_by_stack = np.where(stacks < min_bet, 1.0, 0.0)
+    ruin, expected_rounds, wagered, final = (
+        float(chips < min_bet), 0.0, 0.0, chips
+    )
+    if len(transient):
+        x = absorption(lattice, transient, min_bet)
+        ruin_by_stack[transient] = x[:, 0]
+        first = transient[0]
+        if first <= lattice.start < first + len(transient):
+            ruin, expected_rounds, wagered, final = x[lattice.start - first]
+    return {
+        "ruin": ruin,
+        "target": 1.0 - ruin,
+        "expected_rounds": expected_rounds,
+        "expected_wagered": wagered,
+        "expected_final": final,
+        "hold": (chips - final) / wagered if wagered else 0.0,
+        "stacks": stacks,
+        "ruin_by_stack": ruin_by_stack
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Bankroll risk of ruin")
+    parser.add_argument("chips", type=int)
+    parser.add_argument("target", type=int)
+    parser.add_argument("--bet", type=int, default=MIN_BET)
+    parser.add_argument("--rounds", type=int, default=100000,
+                        help="rounds played to estimate the outcomes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    outcomes = outcome_distribution(args.rounds, seed=args.seed)
+    result = risk_of_ruin(args.chips, outcomes, args.target, args.bet)
+    for key in ("ruin", "target", "expected_rounds", "expected_wagered",
+                "expected_final", "hold"):
+        print(f"{key}: {result[key]:.6g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from collections import namedtuple
+from math import lcm
+
+from classes import HAND_STATES, HI_LO, STATE_BLACKJACK, STATE_PAIR, Dealer
+from engine import deal_hands, play_move
+from exceptions import MoveError
+
+
+EVEN_MONEY, THREE_TO_TWO, SIX_TO_FIVE = (1, 1), (3, 2), (6, 5)
+PAYOUTS = {"1:1": EVEN_MONEY, "3:2": THREE_TO_TWO, "6:5": SIX_TO_FIVE}
+ROUNDS = {}
+# Bits of the index into Round.moves describing a hand about to move.
+TWO_CARDS, PAIR, ROOM, SPLIT, COVERED = (1 << i for i in range(5))
+
+
+class Rules(namedtuple("Rules", (
+    "decks", "penetration", "hit_soft_17", "double_after_split",
+    "resplits", "surrender", "blackjack_pays"
+), defaults=(4, 0.75, False, True, 0, False, EVEN_MONEY))):
+    '''A table's rules. The dealer stands on soft 17 unless
+    `hit_soft_17`; a pair may be split again up to `resplits` times;
+    `surrender` allows late surrender of the first two cards for half
+    the bet; a natural pays `blackjack_pays` as a (win, stake) ratio
+    such as THREE_TO_TWO. Bets must be a multiple of bet_unit, so every
+    payout is a whole number of chips.
+
+    The defaults are those of the classic engine, except that the
+    dealer peeks for a natural and a natural beats any other 21.'''
+
+    __slots__ = ()
+
+    @property
+    def bet_unit(self):
+        return lcm(self.blackjack_pays[1], 2 if self.surrender else 1)
+
+    def check_bet(self, bet):
+        if bet % self.bet_unit:
+            raise ValueError(
+                f"Bets must be a multiple of {self.bet_unit} chips under "
+                f"{self}"
+            )
+
+    def dealer(self, rng=None, csm=False, count_system=HI_LO):
+        return Dealer(self.decks, self.penetration, rng, csm, count_system)
+
+    def compile(self):
+        '''The Round for these rules, built once per process.'''
+        if self not in ROUNDS:
+            ROUNDS[self] = Round(self)
+        return ROUNDS[self]
+
+
+def legal_moves(rules, index):
+    '''The moves offered for a hand described by the bits of `index`.'''
+    moves = ["HIT", "STAND"]
+    if index & TWO_CARDS:
+        if index & COVERED:
+            if index & PAIR and index & ROOM:
+                moves.append("SPLIT")
+            if not index & SPLIT or rules.double_after_split:
+                moves.append("DOUBLE DOWN")
+        if rules.surrender and not index & SPLIT:
+            moves.append("SURRENDER")
+    return tuple(moves)
+
+
+def natural(hand):
+    return STATE_BLACKJACK[hand.state] and not hand.split
+
+
+class Round:
+    '''The round function compiled from a Rules. Every rule is resolved
+    into a lookup table here, so playing a round only indexes tables:
+
+    - `dealer_hits`, indexed by total + 32 * soft, is 1 where the
+      dealer draws;
+    - `moves`, indexed by the hand bits TWO_CARDS | PAIR | ROOM | SPLIT
+      | COVERED (the player can cover another bet), holds the legal
+      moves, and `hand_bits` holds the TWO_CARDS and PAIR bits of each
+      hand state;
+    - `natural_payout` returns the chips paid on a natural bet.
+
+    Seats must be Bots: their move strategies are asked directly and
+    each split or double costs the bet of the hand it is made on. A
+    round whose bets are not multiples of Rules.bet_unit is refused
+    with ValueError before any card is dealt.'''
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.dealer_hits = bytes(
+            total < 17 or total == 17 and soft and rules.hit_soft_17
+            for soft in (False, True) for total in range(32)
+        )
+        self.moves = tuple(legal_moves(rules, index) for index in range(32))
+        self.hand_bits = bytes(
+            TWO_CARDS * (cards == 2) | PAIR * STATE_PAIR[state]
+            for state, (cards, _, _, _) in enumerate(HAND_STATES)
+        )
+        self.max_hands = rules.resplits + 2
+        win, stake = rules.blackjack_pays
+        self.natural_payout = lambda bet: bet + bet * win // stake
+
+    def play_round(self, player, dealer):
+        self.play_table_round([player], dealer)
+        return player, dealer
+
+    def play_table_round(self, players, dealer):
+        bets = [player.bet() for player in players]
+        try:
+            for bet in bets:
+                self.rules.check_bet(bet)
+        except ValueError:
+            for player, bet in zip(players, bets):
+                player.chips += bet
+                player.placed_bet = 0
+            raise
+        deal_hands(players, dealer, bets)
+        dealer_natural = dealer.hand.value == 21
+        if not dealer_natural:
+            live = False
+            for player in players:
+                live |= self.play_hands(player, dealer)
+            if live:
+                dealer_hits = self.dealer_hits
+                hand = dealer.hand
+                while dealer_hits[hand.value + 32 * hand.soft]:
+                    dealer.check_hand()
+        self.settle(players, dealer, dealer_natural)
+
+    def play_hands(self, player, dealer):
+        '''Play each of the player's hands and return whether any is
+        left for the dealer to beat.'''
+        moves, hand_bits = self.moves, self.hand_bits
+        max_hands = self.max_hands
+        move_strategy, dealer_hand = player.move_strategy, dealer.hand
+        hands = player.hands
+        i = 0
+        while i < len(hands):
+            hand = hands[i]
+            if hand.bust:
+                i = play_move(player, dealer, i, "BUST")
+                continue
+            bits = hand_bits[hand.state]
+            if bits:
+                if STATE_BLACKJACK[hand.state] and not hand.split:
+                    i += 1
+                    continue
+                bits |= (
+                    ROOM * (len(hands) < max_hands) | SPLIT * hand.split
+                    | COVERED * (player.chips >= hand.bet)
+                )
+            legal = moves[bits]
+            player_move = move_strategy(hand, dealer_hand, legal)
+            if player_move not in legal:
+                raise MoveError(f"{player_move} is not allowed on {hand}")
+            if player_move == "SPLIT" or player_move == "DOUBLE DOWN":
+                player.chips -= hand.bet
+                player.placed_bet += hand.bet
+                if player_move == "DOUBLE DOWN":
+                    hand.double_down = True
+            i = play_move(player, dealer, i, player_move)
+        return any(
+            not (hand.bust or hand.surrender or natural(hand))
+            for hand in hands
+        )
+
+    def settle(self, players, dealer, dealer_natural):
+        '''Pay every hand: a natural is paid natural_payout unless the
+        dealer has one too, a surrendered hand gets half its bet back and
+        the rest are settled as by engine.settle().'''
+        natural_payout = self.natural_payout
+        dealer_value = 0 if dealer.hand.bust else dealer.hand.value
+        dealer.winner = False
+        for player in players:
+            for hand in player.hands:
+                if hand.surrender:
+                    hand.payout = hand.bet // 2
+                elif STATE_BLACKJACK[hand.state] and not hand.split:
+                    if dealer_natural:
+                        hand.push = True
+                        hand.payout = hand.bet
+                    else:
+                        hand.win = True
+                        hand.payout = natural_payout(hand.bet)
+                elif (
+                    dealer_natural or hand.bust or hand.value < dealer_value
+                ):
+                    hand.payout = 0
+                elif hand.value > dealer_value:
+                    hand.win = True
+                    hand.payout = 2 * hand.bet
+                else:
+                    hand.push = True
+                    hand.payout = hand.bet
+                if not (hand.win or hand.push):
+                    dealer.winner = True
+                player.chips += hand.payout
+            player.winner = any(hand.win for hand in player.hands)
+            player.placed_bet = 0
@@ -0,0 +1,161 @@
+import asyncio
+
+from argparse import ArgumentParser
+from itertools import count
+
+from classes import Dealer, Player
+from engine import deal_hands, next_round, play_dealer, play_move, settle
+from exceptions import BetError
+
+
+TIMEOUT = 300
+BACKLOG = 4096
+tables = count(1)
+
+
+class LeftTable(Exception):
+    pass
+
+
+class Seat(Player):
+    '''A player connected over TCP. Bets and moves are read as lines
+    from the connection instead of the terminal.
+
+    Protocol, one message per line:
+        server: TABLE <id> CHIPS <chips>
+        server: BET?                          client: <chips to bet>
+        server: PLAYER <value> <hand>
+        server: DEALER <value> <hand>
+        server: MOVE? <move>,<move>,...       client: <move>
+        server: RESULT WIN|PUSH|LOSE CHIPS <chips>
+        server: ERROR <message>
+        server: BYE <reason>
+    The client may send QUIT instead of any answer.'''
+
+    def __init__(self, reader, writer, timeout=TIMEOUT):
+        super().__init__()
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+
+    def send(self, line):
+        self.writer.write(f"{line}\n".encode())
+
+    async def receive(self):
+        await self.writer.drain()
+        try:
+            line = await asyncio.wait_for(
+                self.reader.readline(), self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise LeftTable("timeout")
+        except ValueError:
+            raise LeftTable("line too long")
+        line = line.decode(errors="replace").strip().upper()
+        if not line or line == "QUIT":
+            raise LeftTable("quit")
+        return line
+
+    async def ask_bet(self):
+        if self.chips < 10:
+            raise BetError(
+                "Player cannot meet minimum bet requirement...GAME OVER"
+            )
+        while True:
+            self.send("BET?")
+            placed_bet = await self.receive()
+            try:
+                return self.place_bet(int(placed_bet))
+            except (ValueError, BetError):
+                self.send("ERROR Invalid bet by player...")
+
+    async def ask_move(self, player_hand, dealer_hand):
+        if player_hand.bust:
+            return "BUST"
+        moves = self.legal_moves(player_hand)
+        self.send(f"PLAYER {player_hand.value} {player_hand}")
+        self.send(f"DEALER {dealer_hand.value} {dealer_hand}")
+        while True:
+            self.send(f"MOVE? {','.join(moves)}")
+            player_move = await self.receive()
+            if player_move in moves:
+                break
+            self.send(f"ERROR {player_move} is not allowed on this hand")
+        if player_move == "SPLIT":
+            self.bet(player_hand)
+        elif player_move == "DOUBLE DOWN":
+            self.bet(player_hand)
+            player_hand.double_down = True
+        return player_move
+
+
+async def play_round(seat, dealer):
+    '''The engine's round with the seat's bet and moves awaited.'''
+    bet = await seat.ask_bet()
+    deal_hands([seat], dealer, [bet])
+    i = 0
+    while i < len(seat.hands):
+        player_move = await seat.ask_move(seat.hands[i], dealer.hand)
+        i = play_move(seat, dealer, i, player_move)
+    play_dealer([seat], dealer)
+    settle([seat], dealer)
+    for hand in seat.hands:
+        seat.send(f"PLAYER {hand.value} {hand}")
+    seat.send(f"DEALER {dealer.hand.value} {dealer.hand}")
+    if seat.winner:
+        result = "WIN"
+    elif all(hand.push for hand in seat.hands):
+        result = "PUSH"
+    else:
+        result = "LOSE"
+    seat.send(f"RESULT {result} CHIPS {seat.chips}")
+
+
+async def host_table(reader, writer, decks=4, timeout=TIMEOUT):
+    seat = Seat(reader, writer, timeout)
+    dealer = Dealer(decks)
+    seat.send(f"TABLE {next(tables)} CHIPS {seat.chips}")
+    try:
+        while True:
+            await play_round(seat, dealer)
+            next_round(seat, dealer)
+    except BetError:
+        seat.send("BYE no chips")
+    except LeftTable as reason:
+        seat.send(f"BYE {reason}")
+    except ConnectionError:
+        pass
+    try:
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
+
+
+async def serve(host="127.0.0.1", port=8765, decks=4, timeout=TIMEOUT):
+    '''Host a table for every connection to host:port.'''
+    return await asyncio.start_server(
+        lambda reader, writer: host_table(reader, writer, decks, timeout),
+        host, port, limit=1024, backlog=BACKLOG
+    )
+
+
+async def run(host, port, decks, timeout):
+    server = await serve(host, port, decks, timeout)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = ArgumentParser(description="Blackjack table server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--decks", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.decks, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
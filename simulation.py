@@ -0,0 +1,172 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from random import Random
+
+from classes import Bot, Dealer
+import engine
+from engine import flat_bet, mimic_dealer
+from rules import PAYOUTS, Rules
+from stats import Aggregator
+
+try:
+    from batch import ShuffleBank
+except ImportError:
+    ShuffleBank = None
+
+
+BANKROLL = 10 ** 12
+CHUNK_SIZE = 10000
+TALLIES = (
+    "rounds", "wins", "losses", "pushes", "net", "blackjacks", "busts"
+)
+
+
+def chunk_rng(seed, chunk, decks=4, shuffle_bank=False):
+    '''The random stream for one chunk of rounds of a run, or with
+    `shuffle_bank` a ShuffleBank drawing from a NumPy stream.
+
+    Streams belong to chunks rather than to workers, so which process
+    plays a chunk never changes the cards it is dealt.'''
+    if shuffle_bank:
+        return ShuffleBank([seed, chunk], decks)
+    return Random(f"{seed}/{chunk}")
+
+
+def play_chunk(seed, bet_strategy, move_strategy, decks, penetration,
+               shuffle_bank, csm, rules, chunk, rounds):
+    player = Bot(bet_strategy, move_strategy, chips=BANKROLL)
+    rng = chunk_rng(seed, chunk, decks, shuffle_bank)
+    if rules is None:
+        dealer = Dealer(decks, penetration, rng, csm)
+        play = engine.play_round
+    else:
+        dealer, play = rules.dealer(rng, csm), rules.compile().play_round
+    tally = dict.fromkeys(TALLIES, 0)
+    hands = Aggregator()
+    for _ in range(rounds):
+        chips = player.chips
+        play(player, dealer)
+        net = player.chips - chips
+        tally["rounds"] += 1
+        tally["net"] += net
+        if net > 0:
+            tally["wins"] += 1
+        elif net < 0:
+            tally["losses"] += 1
+        else:
+            tally["pushes"] += 1
+        for hand in player.hands:
+            hands.add_hand(hand)
+        engine.next_round(player, dealer)
+        player.chips = BANKROLL
+    tally["busts"] = hands.outcomes["busts"]
+    tally["blackjacks"] = hands.outcomes["blackjacks"]
+    return tally, hands
+
+
+def merge(results):
+    '''Sum the tallies of each chunk and merge their per-hand statistics
+    into a snapshot under "hands".'''
+    total = dict.fromkeys(TALLIES, 0)
+    hands = Aggregator()
+    for tally, chunk_hands in results:
+        for key in TALLIES:
+            total[key] += tally[key]
+        hands.merge(chunk_hands)
+    total["hands"] = hands.snapshot()
+    return total
+
+
+def run(rounds, seed, bet_strategy=None, move_strategy=mimic_dealer,
+        decks=4, penetration=0.75, workers=None, chunk_size=CHUNK_SIZE,
+        shuffle_bank=False, csm=False, rules=None):
+    '''Play `rounds` headless rounds split into chunks of `chunk_size`
+    and return the merged tallies.
+
+    The result depends only on the arguments other than `workers`. The
+    strategies are sent to the worker processes, so they must be
+    picklable: module level functions or functools.partial objects.
+    With `shuffle_bank` each chunk's shoe orders are generated in bulk
+    with NumPy instead of shuffled one at a time. With `csm` the cards
+    are dealt from a continuous shuffling machine. With `rules`, a
+    rules.Rules, rounds are played by its compiled Round and its decks
+    and penetration replace those given.'''
+    if rules is not None:
+        decks, penetration = rules.decks, rules.penetration
+    if bet_strategy is None:
+        bet_strategy = flat_bet()
+    if shuffle_bank and ShuffleBank is None:
+        raise ValueError("A shuffle bank needs NumPy")
+    sizes = [
+        min(chunk_size, rounds - start)
+        for start in range(0, rounds, chunk_size)
+    ]
+    job = partial(
+        play_chunk, seed, bet_strategy, move_strategy, decks, penetration,
+        shuffle_bank, csm, rules
+    )
+    if workers == 1:
+        return merge(map(job, range(len(sizes)), sizes))
+    with ProcessPoolExecutor(workers) as pool:
+        return merge(pool.map(job, range(len(sizes)), sizes))
+
+
+def main():
+    parser = ArgumentParser(description="Monte Carlo blackjack simulation")
+    parser.add_argument("rounds", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--decks", type=int, default=4)
+    parser.add_argument("--penetration", type=float, default=0.75)
+    parser.add_argument("--bet", type=int, default=10)
+    parser.add_argument(
+        "--shuffle-bank", action="store_true",
+        help="generate shoe orders in bulk with NumPy"
+    )
+    parser.add_argument(
+        "--csm", action="store_true",
+        help="deal from a continuous shuffling machine"
+    )
+    parser.add_argument(
+        "--rules", action="store_true",
+        help="play by the rule set below instead of the classic rules"
+    )
+    parser.add_argument("--h17", action="store_true",
+                        help="the dealer hits soft 17")
+    parser.add_argument("--no-das", action="store_true",
+                        help="no doubling after a split")
+    parser.add_argument("--resplits", type=int, default=0)
+    parser.add_argument("--surrender", action="store_true")
+    parser.add_argument("--blackjack-pays", choices=PAYOUTS, default="1:1")
+    args = parser.parse_args()
+    rules = None
+    if args.rules:
+        rules = Rules(
+            args.decks, args.penetration, args.h17, not args.no_das,
+            args.resplits, args.surrender, PAYOUTS[args.blackjack_pays]
+        )
+        if args.bet % rules.bet_unit:
+            parser.error(
+                f"--bet must be a multiple of {rules.bet_unit} chips "
+                f"under these rules"
+            )
+    results = run(
+        args.rounds, args.seed, flat_bet(args.bet), decks=args.decks,
+        penetration=args.penetration, workers=args.workers,
+        shuffle_bank=args.shuffle_bank, csm=args.csm, rules=rules
+    )
+    for key in TALLIES:
+        print(f"{key}: {results[key]}")
+    print(f"EV per round: {results['net'] / (args.bet * results['rounds']):.4f}")
+    hands = results["hands"]
+    low, high = hands["confidence_interval"]
+    print(
+        f"EV per hand: {hands['mean'] / args.bet:.4f} "
+        f"(95% CI {low / args.bet:.4f} to {high / args.bet:.4f}, "
+        f"stdev {hands['stdev'] / args.bet:.4f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
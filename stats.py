@@ -0,0 +1,105 @@
+from math import sqrt
+
+
+OUTCOMES = (
+    "wins", "losses", "pushes", "blackjacks", "busts", "doubles", "splits"
+)
+Z_95 = 1.959963984540054
+
+
+class Aggregator:
+    '''Streaming statistics of per-hand net results in constant memory:
+    the count, exact total, running mean and variance (Welford), a
+    histogram of `bins` equal bins between `low` and `high` (results
+    outside fall in the end bins) and counts of each of OUTCOMES.
+
+    Aggregators of separate streams, such as the chunks of a run played
+    in different processes, combine with merge().'''
+
+    def __init__(self, low=-40, high=40, bins=16):
+        self.low = low
+        self.high = high
+        self.width = (high - low) / bins
+        self.histogram = [0] * bins
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, net):
+        self.count += 1
+        self.total += net
+        delta = net - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (net - self.mean)
+        i = int((net - self.low) // self.width)
+        self.histogram[min(max(i, 0), len(self.histogram) - 1)] += 1
+
+    def add_hand(self, hand):
+        '''Add a settled hand's net result and count its outcomes from
+        the flags it carries. The net result is taken from the hand's
+        payout when it has one, else from its flags.'''
+        outcomes = self.outcomes
+        if hand.win:
+            outcomes["wins"] += 1
+            net = hand.bet
+        elif hand.push:
+            outcomes["pushes"] += 1
+            net = 0
+        else:
+            outcomes["losses"] += 1
+            net = -hand.bet
+        if hand.payout is not None:
+            net = hand.payout - hand.bet
+        if hand.bust:
+            outcomes["busts"] += 1
+        if hand.double_down:
+            outcomes["doubles"] += 1
+        if hand.split:
+            outcomes["splits"] += 1
+        elif len(hand) == 2 and hand.value == 21:
+            outcomes["blackjacks"] += 1
+        self.add(net)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def confidence_interval(self, z=Z_95):
+        '''The interval of `z` standard errors around the mean.'''
+        error = z * sqrt(self.variance / self.count) if self.count else 0.0
+        return self.mean - error, self.mean + error
+
+    def merge(self, other):
+        '''Fold the results of `other` into this aggregator.'''
+        if (other.low, other.high, len(other.histogram)) != (
+            self.low, self.high, len(self.histogram)
+        ):
+            raise ValueError("Cannot merge histograms with different bins")
+        count = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * (
+                self.count * other.count / count
+            )
+        self.count = count
+        self.total += other.total
+        for i, n in enumerate(other.histogram):
+            self.histogram[i] += n
+        for outcome, n in other.outcomes.items():
+            self.outcomes[outcome] += n
+        return self
+
+    def snapshot(self):
+        return {
+            "count": self.count, "total": self.total, "mean": self.mean,
+            "variance": self.variance, "stdev": sqrt(self.variance),
+            "confidence_interval": self.confidence_interval(),
+            "histogram": {
+                self.low + i * self.width: n
+                for i, n in enumerate(self.histogram)
+            },
+            **self.outcomes
+        }
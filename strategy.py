@@ -0,0 +1,182 @@
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+from math import isnan, nan
+
+from cache import table_key
+from classes import Card, DECK, Hand
+from probability import action_values, composition, remove
+
+
+STAND, HIT, DOUBLE, DOUBLE_STAND, SPLIT = range(5)
+ACTIONS = ("S", "H", "D", "Ds", "P")
+HARD, SOFT, PAIRS = 0, 220, 440
+UP_CARDS = range(2, 12)
+EV_MOVES = ("HIT", "STAND", "DOUBLE DOWN", "SPLIT")
+EV_VERSION = 1
+CHARTS = {}
+
+
+def pip_card(pip):
+    return Card("Clubs", "Ace" if pip == 11 else pip)
+
+
+def two_card_hands():
+    '''A representative two card hand for each row of the chart as
+    (offset of the row, pips of the cards).'''
+    for total in range(4, 21):
+        low = 2 if total <= 11 else 10
+        yield HARD + total * 10, (low, total - low)
+    for total in range(12, 21):
+        yield SOFT + total * 10, (11, total - 11 if total > 12 else 11)
+    for pip in range(2, 12):
+        yield PAIRS + pip * 10, (pip, pip)
+
+
+def best_action(values):
+    best = max(values, key=values.get)
+    if best == "SPLIT":
+        return SPLIT
+    if best == "DOUBLE DOWN":
+        return DOUBLE if values["HIT"] > values["STAND"] else DOUBLE_STAND
+    return HIT if best == "HIT" else STAND
+
+
+ROWS = tuple(two_card_hands())
+
+
+class Model(namedtuple("Model", (
+    "decks", "hit_soft_17", "double_after_split", "peek"
+))):
+    '''The rules move values are worked out under, part of the key of
+    every cached table: a pair is split once and nothing surrendered.'''
+
+    __slots__ = ()
+
+
+def ev_column(model, up_card):
+    '''The expected value of each of EV_MOVES for each of ROWS against
+    one up-card, NaN where the move is not offered.'''
+    shoe = remove(composition(DECK * model.decks), up_card)
+    column = array("d")
+    for row, pips in ROWS:
+        hand = Hand([pip_card(pip) for pip in pips])
+        moves = EV_MOVES if row >= PAIRS else EV_MOVES[:3]
+        values = action_values(
+            hand, up_card, remove(shoe, *pips), moves, model.hit_soft_17,
+            model.double_after_split, model.peek
+        )
+        column.extend(values.get(move, nan) for move in EV_MOVES)
+    return column
+
+
+def modelled(decks, rules):
+    '''The Model of the classic engine with a shoe of `decks` decks,
+    where the dealer stands on soft 17 and never peeks, or of the
+    rules.Rules `rules`, whose dealer always peeks.'''
+    if rules is None:
+        return Model(decks, False, True, False)
+    if rules.resplits or rules.surrender:
+        raise ValueError(
+            f"Move values are not worked out for resplits or surrender: "
+            f"{rules}"
+        )
+    return Model(rules.decks, rules.hit_soft_17, rules.double_after_split,
+                 True)
+
+
+def ev_table(decks=4, workers=None, cache=None, rules=None):
+    '''The values of ev_column() against every up-card as one array of
+    doubles laid out [up card][row][move], for the modelled() rules of
+    a shoe of `decks` decks or of the rules.Rules `rules`. Each up-card
+    is worked out in its own process. With `cache`, a cache.TableCache,
+    the table is worked out once for the rules and shoe and loaded from
+    disk by every later run.'''
+    model = modelled(decks, rules)
+
+    def compute():
+        column = partial(ev_column, model)
+        if workers == 1:
+            columns = list(map(column, UP_CARDS))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                columns = list(pool.map(column, UP_CARDS))
+        return array("d", chain.from_iterable(columns))
+    if cache is None:
+        return memoryview(compute())
+    return cache.load(table_key(
+        "ev_table", EV_VERSION, model, composition(DECK * model.decks)
+    ), compute)
+
+
+class Chart:
+    '''A basic strategy chart: the best move for each hard total, soft
+    total and pair against each dealer up-card, kept as one bytes
+    table so a decision is a single index.'''
+
+    def __init__(self, table):
+        self.table = bytes(table)
+
+    @classmethod
+    def from_columns(cls, columns):
+        table = bytearray(3 * 22 * 10)
+        for i, column in enumerate(columns):
+            for row, action in column.items():
+                table[row + i] = action
+        return cls(table)
+
+    @classmethod
+    def from_ev_table(cls, values):
+        '''The chart of the best move in each cell of an ev_table().'''
+        columns = []
+        for i in range(len(UP_CARDS)):
+            column = {}
+            for j, (row, _) in enumerate(ROWS):
+                start = (i * len(ROWS) + j) * len(EV_MOVES)
+                column[row] = best_action({
+                    move: values[start + k]
+                    for k, move in enumerate(EV_MOVES)
+                    if not isnan(values[start + k])
+                })
+            columns.append(column)
+        return cls.from_columns(columns)
+
+    def __str__(self):
+        rows = ["      " + " ".join(f"{up:>2}" for up in UP_CARDS)]
+        for name, offset, totals in [
+            ("Hard", HARD, range(4, 22)), ("Soft", SOFT, range(12, 22)),
+            ("Pair", PAIRS, range(2, 12))
+        ]:
+            for total in totals:
+                rows.append(f"{name} {total:>2}" + "".join(
+                    f" {ACTIONS[self.table[offset + total * 10 + i]]:>2}"
+                    for i in range(10)
+                ))
+        return "\n".join(rows)
+
+    def move(self, player_hand, dealer_hand, moves):
+        up = dealer_hand.cards[0].pip - 2
+        pair = PAIRS + player_hand.cards[0].pip * 10 + up
+        if "SPLIT" in moves and self.table[pair] == SPLIT:
+            return "SPLIT"
+        offset = SOFT if player_hand.soft else HARD
+        action = self.table[offset + player_hand.value * 10 + up]
+        if action == DOUBLE or action == DOUBLE_STAND:
+            if "DOUBLE DOWN" in moves:
+                return "DOUBLE DOWN"
+            return "HIT" if action == DOUBLE else "STAND"
+        return "HIT" if action == HIT else "STAND"
+
+
+def basic_strategy(decks=4, workers=None, cache=None, rules=None):
+    '''The basic strategy chart for a shoe of `decks` decks or for the
+    rules.Rules `rules`, built from its ev_table() and kept for the rest
+    of the session once generated.'''
+    model = modelled(decks, rules)
+    if model not in CHARTS:
+        CHARTS[model] = Chart.from_ev_table(
+            ev_table(decks, workers, cache, rules)
+        )
+    return CHARTS[model]
@@ -0,0 +1,102 @@
+from array import array
+from unittest import TestCase, skipIf
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import classes
+import engine
+import simulation
+
+if numpy is not None:
+    import batch
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class TestBatchMatchesEngine(TestCase):
+    '''Verify that a shoe played by the batch simulator gives the same
+    result each round as the same shoe played by the round engine.'''
+
+    def setUp(self):
+        self.table = batch.dealer_table()
+        self.table[9:12, 0] = batch.DOUBLE
+        self.table[13:18, 1] = batch.DOUBLE
+
+    def test_batch_round_results(self):
+        for seed in range(25):
+            with self.subTest(seed=seed):
+                shoes = batch.BatchShoes(1, decks=2, rng=seed)
+                dealer = classes.Dealer(decks=2)
+                dealer.cards.cards[:] = array('B', shoes.cards[0].tobytes())
+                bot = classes.Bot(
+                    engine.flat_bet(10), batch.table_strategy(self.table),
+                    chips=10 ** 6
+                )
+                while shoes.position[0] < shoes.cut_card:
+                    net, bust = batch.play_round(shoes, self.table)
+                    chips = bot.chips
+                    engine.play_round(bot, dealer)
+                    engine.next_round(bot, dealer)
+                    self.assertEqual(bot.chips - chips, net[0])
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class TestBatchSimulate(TestCase):
+    '''Verify that a batch simulation tallies every round it plays.'''
+
+    def test_simulate_tallies(self):
+        results = batch.simulate(tables=500, rounds=20, seed=7)
+        self.assertEqual(results["rounds"], 10000)
+        self.assertEqual(
+            results["wins"] + results["losses"] + results["pushes"], 10000
+        )
+        self.assertLessEqual(results["busts"], results["losses"])
+        self.assertEqual(results, batch.simulate(500, 20, seed=7))
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class TestShuffleBank(TestCase):
+    '''Verify that dealers can shuffle with a NumPy Generator or from a
+    bank of shoe orders generated in bulk.'''
+
+    def test_bank_orders_are_shoe_permutations(self):
+        bank = batch.ShuffleBank(3, decks=2, shoes=4)
+        dealers = [classes.Dealer(decks=2, rng=bank) for _ in range(3)]
+        orders = [bytes(dealer.cards.cards) for dealer in dealers]
+        for dealer in dealers:
+            dealer.shuffle_cards()
+            orders.append(bytes(dealer.cards.cards))
+        self.assertEqual(bank.next, 2)
+        for order in orders:
+            self.assertEqual(sorted(order), sorted(classes.DECK * 2))
+        self.assertEqual(len(set(orders)), len(orders))
+
+    def test_bank_is_seeded(self):
+        first, second = (
+            classes.Dealer(rng=batch.ShuffleBank(11)) for _ in range(2)
+        )
+        self.assertEqual(first.cards.cards, second.cards.cards)
+
+    def test_numpy_generator_rng(self):
+        dealer = classes.Dealer(rng=numpy.random.default_rng(5))
+        dealer.shuffle_cards()
+        self.assertEqual(
+            sorted(dealer.cards.cards), sorted(classes.DECK * 4)
+        )
+
+    def test_simulation_with_shuffle_bank(self):
+        results = simulation.run(
+            2000, seed=4, workers=1, chunk_size=500, shuffle_bank=True
+        )
+        self.assertEqual(results["rounds"], 2000)
+        self.assertEqual(
+            results,
+            simulation.run(
+                2000, seed=4, workers=2, chunk_size=500, shuffle_bank=True
+            )
+        )
+        self.assertNotEqual(
+            results, simulation.run(2000, seed=4, workers=1, chunk_size=500)
+        )
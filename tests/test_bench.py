@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+import bench
+
+
+class TestBenchmarkReport(TestCase):
+    '''Verify that benchmarks report their throughput and that a run
+    slower than its baseline is flagged.'''
+
+    def test_run_selected_benchmark(self):
+        report = bench.run(["hand_value_soft"], repeat=1)
+        self.assertEqual(list(report["results"]), ["hand_value_soft"])
+        self.assertGreater(
+            report["results"]["hand_value_soft"]["ops_per_sec"], 0
+        )
+
+    def test_compare_flags_regression(self):
+        baseline = {"results": {
+            "game_round": {"ops_per_sec": 1000},
+            "card_construct": {"ops_per_sec": 1000}
+        }}
+        report = {"results": {
+            "game_round": {"ops_per_sec": 850},
+            "card_construct": {"ops_per_sec": 950},
+            "hand_value_soft": {"ops_per_sec": 10}
+        }}
+        ratios, regressions = bench.compare(report, baseline, tolerance=0.1)
+        self.assertEqual(set(ratios), {"game_round", "card_construct"})
+        self.assertEqual(regressions, ["game_round"])
@@ -0,0 +1,89 @@
+import os
+
+from array import array
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+import cache
+
+
+class TestTableCache(TestCase):
+    '''Verify that tables survive a round trip through the cache files,
+    that damaged files are misses and that the least recently used
+    tables are evicted past the size cap.'''
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = cache.TableCache(self.directory.name)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get("missing"))
+        for typecode, items in [("d", [0.5, -1.25, 3.0]), ("B", b"\x01\x02")]:
+            with self.subTest(typecode=typecode):
+                self.cache.put(typecode, array(typecode, items))
+                table = self.cache.get(typecode)
+                self.assertEqual(table.format, typecode)
+                self.assertEqual(list(table), list(items))
+                self.assertTrue(table.readonly)
+
+    def test_load_computes_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return array("q", range(10))
+        key = cache.table_key("test", 4, (16, 4))
+        self.assertEqual(key, cache.table_key("test", 4, (16, 4)))
+        self.assertNotEqual(key, cache.table_key("test", 6, (16, 4)))
+        for _ in range(3):
+            self.assertEqual(
+                list(self.cache.load(key, compute)), list(range(10))
+            )
+        self.assertEqual(len(calls), 1)
+
+    def test_damaged_files_miss(self):
+        self.cache.put("table", array("d", [1.0, 2.0]))
+        path = self.cache.file("table")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 4)
+        self.assertIsNone(self.cache.get("table"))
+        with open(path, "wb") as f:
+            f.write(b"not a table at all")
+        self.assertIsNone(self.cache.get("table"))
+        with open(path, "wb"):
+            pass
+        self.assertIsNone(self.cache.get("table"))
+
+    def test_least_recently_used_evicted(self):
+        table = array("d", range(100))
+        size = cache.HEADER.size + 800
+        self.cache.max_bytes = 2 * size
+        for i, key in enumerate(["a", "b"]):
+            self.cache.put(key, table)
+            os.utime(self.cache.file(key), ns=(i + 1, i + 1))
+        self.cache.get("a")
+        self.cache.put("c", table)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_unwritable_cache_skipped(self):
+        blocker = os.path.join(self.directory.name, "file")
+        with open(blocker, "wb"):
+            pass
+        unwritable = cache.TableCache(os.path.join(blocker, "cache"))
+        self.assertIsNone(unwritable.get("table"))
+        self.assertFalse(unwritable.put("table", array("d", [1.0])))
+        self.assertEqual(
+            list(unwritable.load("table", lambda: array("d", [1.0, 2.0]))),
+            [1.0, 2.0]
+        )
+
+    def test_read_only_hit(self):
+        self.cache.put("table", array("d", [1.0, 2.0]))
+        with patch("cache.os.utime", side_effect=PermissionError):
+            self.assertEqual(list(self.cache.get("table")), [1.0, 2.0])
@@ -1,8 +1,11 @@
 
+from itertools import product
+from random import Random
 from unittest import TestCase, main
 from unittest.mock import patch, Mock, MagicMock
 
 import classes
+import engine
 import exceptions
 
 
@@ -40,6 +43,143 @@ class TestBlackjackFaceCard(TestCase):
         self.assertEqual(repr(self.face_card), "Card(Hearts, Ace)")
 
 
+class TestBlackjackCardInterning(TestCase):
+    '''Verify that every card of a suit and value is the same shared
+    instance and that a dealer\'s shoe holds card codes.'''
+
+    def test_card_is_interned(self):
+        card = classes.Card("Clubs", 7)
+        self.assertIs(card, classes.Card("Clubs", 7))
+        self.assertIs(card, classes.CARDS[card.code])
+
+    def test_card_is_slotted(self):
+        with self.assertRaises(AttributeError):
+            classes.Card("Clubs", 7).color = "Black"
+
+    def test_dealer_shoe_card_codes(self):
+        dealer = classes.Dealer()
+        self.assertEqual(len(dealer.cards), 208)
+        self.assertEqual(sorted(dealer.cards), sorted(classes.DECK * 4))
+
+
+class TestShoeCutCard(TestCase):
+    '''Verify that a shoe deals from a cursor and asks to be reshuffled
+    once the cut card has been reached.'''
+
+    def setUp(self):
+        self.shoe = classes.Shoe(decks=6, penetration=0.5)
+
+    def test_shoe_size(self):
+        self.assertEqual(len(self.shoe), 312)
+        self.assertEqual(self.shoe.cut_card, 156)
+
+    def test_shoe_needs_shuffle(self):
+        for _ in range(155):
+            self.shoe.draw()
+        self.assertFalse(self.shoe.needs_shuffle)
+        self.shoe.draw()
+        self.assertTrue(self.shoe.needs_shuffle)
+        self.assertEqual(len(self.shoe), 156)
+
+    def test_shoe_shuffle_in_place(self):
+        cards = self.shoe.cards
+        self.shoe.draw()
+        self.shoe.shuffle()
+        self.assertIs(self.shoe.cards, cards)
+        self.assertEqual(len(self.shoe), 312)
+
+
+class TestShoeDiscardTray(TestCase):
+    '''Verify that a shoe running out mid-round reshuffles only its
+    discard tray and that a continuous shuffling machine returns every
+    discard to the shoe.'''
+
+    def test_discard_tray_reshuffled_mid_round(self):
+        shoe = classes.Shoe(decks=1, penetration=1.0)
+        for _ in range(40):
+            shoe.draw()
+        shoe.discard()
+        self.assertEqual(shoe.discarded, 40)
+        table = [shoe.draw().code for _ in range(12)]
+        dealt = [shoe.draw().code for _ in range(40)]
+        self.assertEqual(sorted(table + dealt), list(classes.DECK))
+        self.assertEqual(len(shoe.cards), 52)
+        with self.assertRaises(ValueError):
+            shoe.draw()
+
+    def test_constant_size_over_rounds(self):
+        dealer = classes.Dealer(decks=1)
+        bot = classes.Bot(engine.flat_bet(10), engine.mimic_dealer, 10 ** 6)
+        for _ in range(2000):
+            engine.play_round(bot, dealer)
+            engine.next_round(bot, dealer)
+            self.assertLessEqual(dealer.cards.discarded, 52)
+        self.assertEqual(sorted(dealer.cards.cards), list(classes.DECK))
+
+    def test_continuous_shuffling_machine(self):
+        shoe = classes.Shoe(decks=1, rng=Random(2), csm=True)
+        aces = 0
+        for _ in range(13000):
+            aces += shoe.draw().rank == classes.ACE
+            shoe.draw()
+            shoe.discard()
+            self.assertFalse(shoe.needs_shuffle)
+            self.assertEqual(len(shoe), 52)
+        self.assertEqual(sorted(shoe.cards), list(classes.DECK))
+        self.assertAlmostEqual(aces / 13000, 1 / 13, delta=0.01)
+
+
+class TestShoeRunningCount(TestCase):
+    '''Verify that a shoe keeps the running count of the cards dealt
+    since it was shuffled for each count system.'''
+
+    def scan(self, shoe, codes):
+        return shoe.count_system.initial_count(shoe.decks) + sum(
+            shoe.count_system.rank_weights[code % 13] for code in codes
+        )
+
+    def test_running_count_matches_scan(self):
+        for system in classes.COUNT_SYSTEMS.values():
+            with self.subTest(system=system.name):
+                shoe = classes.Shoe(
+                    decks=2, rng=Random(4), count_system=system
+                )
+                for _ in range(3):
+                    dealt = [shoe.draw().code for _ in range(75)]
+                    self.assertEqual(
+                        shoe.running_count, self.scan(shoe, dealt)
+                    )
+                    self.assertAlmostEqual(
+                        shoe.true_count, shoe.running_count / (29 / 52)
+                    )
+                    shoe.shuffle()
+
+    def test_full_shoe_counts(self):
+        for system, end in [
+            (classes.HI_LO, 0), (classes.OMEGA_II, 0), (classes.KO, 4)
+        ]:
+            with self.subTest(system=system.name):
+                shoe = classes.Shoe(decks=6, count_system=system)
+                for _ in range(312):
+                    shoe.draw()
+                self.assertEqual(shoe.running_count, end)
+
+    def test_count_after_discard_tray_reshuffle(self):
+        shoe = classes.Shoe(decks=1, penetration=1.0)
+        for _ in range(45):
+            shoe.draw()
+        shoe.discard()
+        table = [shoe.draw().code for _ in range(8)]
+        self.assertEqual(shoe.running_count, self.scan(shoe, table))
+
+    def test_csm_count_resets_every_round(self):
+        shoe = classes.Shoe(csm=True)
+        for _ in range(10):
+            shoe.draw()
+        shoe.discard()
+        self.assertEqual(shoe.running_count, 0)
+
+
 class TestBlackjackHandStrings(TestCase):
     '''Verify that a blackjack hand has a str and repr string'''
 
@@ -113,6 +253,81 @@ class TestBlackjackSoftHandValue(TestCase):
                 self.assertEqual(hand.value, self.hand_values[i])
 
 
+class TestBlackjackHandAppend(TestCase):
+    '''Verify that appending a card keeps the value, softness and bust
+    status of a hand current without changing the cards themselves.'''
+
+    def setUp(self):
+        self.ace = classes.Card("Spades", "Ace")
+        self.hand = classes.Hand([self.ace, classes.Card("Clubs", 6)])
+
+    def test_soft_hand_hardens(self):
+        self.assertEqual(self.hand.value, 17)
+        self.assertTrue(self.hand.soft)
+        self.hand.append(classes.Card("Hearts", 9))
+        self.assertEqual(self.hand.value, 16)
+        self.assertFalse(self.hand.soft)
+        self.assertFalse(self.hand.bust)
+        self.assertEqual(self.ace.pip, 11)
+
+    def test_soft_twenty_one_plus_ace(self):
+        self.hand.append(classes.Card("Hearts", 4))
+        self.hand.append(classes.Card("Hearts", "Ace"))
+        self.assertEqual(self.hand.value, 12)
+        self.assertFalse(self.hand.soft)
+
+    def test_hand_bust(self):
+        self.hand.append(classes.Card("Hearts", 9))
+        self.hand.append(classes.Card("Hearts", "King"))
+        self.assertEqual(self.hand.value, 26)
+        self.assertTrue(self.hand.bust)
+
+
+class TestHandStates(TestCase):
+    '''Verify that the state table gives the value, softness, bust,
+    pair and blackjack status of every hand of up to four ranks.'''
+
+    def reference(self, ranks):
+        low = sum(1 if rank == classes.ACE else classes.PIPS[rank]
+                  for rank in ranks)
+        soft = classes.ACE in ranks and low <= 11
+        return low + 10 * soft, soft, low > 21
+
+    def test_states_match_card_values(self):
+        self.assertLess(len(classes.HAND_STATES), 256)
+        for ranks in product(range(13), repeat=3):
+            for length in (2, 3):
+                hand = classes.Hand(
+                    [classes.CARDS[rank] for rank in ranks[:length]]
+                )
+                self.assertEqual(
+                    (hand.value, hand.soft, hand.bust),
+                    self.reference(ranks[:length])
+                )
+                self.assertEqual(
+                    hand.pair, length == 2 and ranks[0] == ranks[1]
+                )
+                self.assertEqual(
+                    hand.blackjack, length == 2 and hand.value == 21
+                )
+
+    def test_split_needs_a_pair(self):
+        player = classes.Player()
+        player.placed_bet = 10
+        for values, split in [
+            (("Jack", "Jack"), True), (("Jack", "Queen"), False),
+            ((10, "King"), False), ((8, 8), True)
+        ]:
+            with self.subTest(values=values):
+                player.hands = [classes.Hand([
+                    classes.Card("Clubs", values[0]),
+                    classes.Card("Hearts", values[1])
+                ])]
+                self.assertEqual(
+                    "SPLIT" in player.legal_moves(player.hands[0]), split
+                )
+
+
 class TestBlackjackHandComparisonOperators(TestCase):
     '''Verify that one blackjack hand can be compared with another
     blackjack hand.'''
@@ -179,12 +394,13 @@ class TestPlayerAdditionalBet(TestCase):
         self.player.hands = [classes.Hand([
             classes.Card("Spades", 2), classes.Card("Hearts", 'King')
         ])]
+        self.player.hands[0].bet = 40
         self.player.placed_bet = 40
         self.player.chips = 25
 
     def test_player_bet_exceeds_chip_amount(self):
         with self.assertRaises(exceptions.BetError) as error:
-            self.player.bet()
+            self.player.bet(self.player.hands[0])
             self.assertEqual(
                 error.msg,
                 "Bet placed is greate than chip stack...bet disallowed"
@@ -204,6 +420,7 @@ class TestPlayerMoveSplitHandPass(TestCase):
             classes.Card("Clubs", "Ace"), classes.Card("Diamonds", "Ace")
         ])]
         self.hand = self.player.hands[0]
+        self.hand.bet = 30
         self.dealer = classes.Dealer()
         self.dealer.hand = classes.Hand([
             classes.Card("Spades", "Jack"), classes.Card("Spades", 6)
@@ -230,6 +447,7 @@ class TestPlayerMoveDoubleDownHand(TestCase):
             classes.Card("Diamonds", "King"), classes.Card("Diamonds", 3)
         ])]
         self.hand = self.player.hands[0]
+        self.hand.bet = 15
         self.dealer = classes.Dealer()
         self.dealer.hand = classes.Hand([
             classes.Card("Spades", "Jack"), classes.Card("Spades", 5)
@@ -256,6 +474,7 @@ class TestPlayMoveSplitHandInvalidBet(TestCase):
             classes.Card("Clubs", 4), classes.Card("Hearts", 4)
         ])]
         self.hand = self.player.hands[0]
+        self.hand.bet = 50
         self.dealer = classes.Dealer()
         self.dealer.hand = classes.Hand([
             classes.Card("Spades", "Jack"), classes.Card("Spades", 6)
@@ -271,6 +490,34 @@ class TestPlayMoveSplitHandInvalidBet(TestCase):
         self.assertEqual(self.player.placed_bet, 50)
 
 
+class TestPlayMoveSplitHandNotPair(TestCase):
+    '''Verify that a player must consider a different move if they
+    want to split two cards of different ranks.'''
+
+    def setUp(self):
+        self.player = classes.Player()
+        self.player.chips = 45
+        self.player.placed_bet = 10
+        self.player.hands = [classes.Hand([
+            classes.Card("Clubs", "Jack"), classes.Card("Hearts", "Queen")
+        ])]
+        self.hand = self.player.hands[0]
+        self.dealer_hand = classes.Hand([
+            classes.Card("Spades", "Jack"), classes.Card("Spades", 6)
+        ])
+
+    @patch("classes.screen")
+    @patch("classes.input", side_effect=["SPLIT", "STAND"])
+    def test_player_move_split_not_pair(self, mock_input, mock_screen):
+        move = self.player.check_hand(self.hand, self.dealer_hand)
+        self.assertEqual(move, "STAND")
+        self.assertEqual(mock_input.call_count, 2)
+        self.assertIn(
+            "same pip/face card", mock_screen.message.call_args.args[0]
+        )
+        self.assertEqual(self.player.chips, 45)
+
+
 class TestPlayMoveHandBust(TestCase):
     '''Verify that a player cannot make any more plays on their hand
     if the value of the hand is greater than 21.'''
@@ -0,0 +1,84 @@
+from collections import Counter
+from random import Random
+from unittest import TestCase
+
+import classes
+import compare
+from engine import mimic_dealer
+
+
+def always_stand(player_hand, dealer_hand, moves):
+    return "STAND"
+
+
+class TestCommonRandomNumbers(TestCase):
+    '''Verify that every strategy plays each round from the same cards
+    and that the comparison stops once the difference is significant.'''
+
+    def test_shoe_restore_deals_same_cards(self):
+        shoe = classes.Shoe(decks=1, rng=Random(2))
+        saved = shoe.save()
+        first = [shoe.draw() for _ in range(20)]
+        shoe.restore(saved)
+        self.assertEqual(shoe.running_count, 0)
+        self.assertEqual([shoe.draw() for _ in range(20)], first)
+        self.assertEqual(shoe.running_count, sum(
+            shoe.weights[card.code] for card in first
+        ))
+
+    def test_same_strategy_never_differs(self):
+        results = compare.compare(
+            [mimic_dealer, mimic_dealer], 2000, seed=5, min_rounds=0
+        )
+        self.assertEqual(results["rounds"], 2000)
+        self.assertFalse(results["significant"])
+        difference = results["differences"][0]
+        self.assertEqual(difference["total"], 0)
+        self.assertEqual(difference["variance"], 0)
+        self.assertEqual(
+            results["strategies"][0]["total"],
+            compare.compare([mimic_dealer, always_stand], 2000, seed=5,
+                            min_rounds=2000)["strategies"][0]["total"]
+        )
+
+    def test_early_stop(self):
+        results = compare.compare(
+            [mimic_dealer, always_stand], 50000, seed=1, min_rounds=1000,
+            check_every=500
+        )
+        self.assertTrue(results["significant"])
+        self.assertLess(results["rounds"], 50000)
+        self.assertEqual(results["rounds"] % 500, 0)
+        low, high = results["differences"][0]["confidence_interval"]
+        self.assertTrue(low > 0 or high < 0)
+        with self.assertRaises(ValueError):
+            compare.compare([mimic_dealer], 10)
+
+
+class TestAntitheticShoes(TestCase):
+    '''Verify that the mirrored shoe keeps the composition of the shoe
+    and pairs with the original order.'''
+
+    def test_mirror_composition(self):
+        shoe = classes.Shoe(decks=2, rng=Random(7))
+        twin = classes.Shoe(decks=2, rng=compare.Mirror(Random(7), 2))
+        self.assertEqual(Counter(shoe.cards), Counter(twin.cards))
+        for code, mirrored in zip(shoe.cards, twin.cards):
+            rank, twin_rank = code % 13, mirrored % 13
+            self.assertEqual(code // 13, mirrored // 13)
+            self.assertEqual(twin_rank, 7 - rank if rank < 8 else rank)
+
+    def test_mirror_keeps_discard_tray(self):
+        twin = classes.Shoe(decks=1, rng=compare.Mirror(Random(7), 1))
+        twin.position, twin.discarded = len(twin.cards), 40
+        tray = Counter(twin.cards[:40])
+        twin.shuffle_discards()
+        self.assertEqual(Counter(twin.cards[twin.position:]), tray)
+
+    def test_antithetic_comparison(self):
+        results = compare.compare(
+            [mimic_dealer, always_stand], 1000, seed=3, antithetic=True
+        )
+        self.assertEqual(results["rounds"], 1000)
+        self.assertEqual(len(results["strategies"]), 2)
+        self.assertGreater(results["differences"][0]["efficiency"], 1)
@@ -0,0 +1,179 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import classes
+import engine
+import exceptions
+
+
+class TestBotPlayerMoves(TestCase):
+    '''Verify that a bot is only offered the moves its hand allows
+    and that splitting or doubling down places a second bet.'''
+
+    def setUp(self):
+        self.bot = classes.Bot(engine.flat_bet(20), engine.mimic_dealer)
+        self.bot.place_bet(20)
+        self.bot.hands = [classes.Hand([
+            classes.Card("Clubs", 8), classes.Card("Hearts", 8)
+        ])]
+        self.bot.hands[0].bet = 20
+        self.dealer_hand = classes.Hand([
+            classes.Card("Spades", "Jack"), classes.Card("Spades", 6)
+        ])
+
+    def test_bot_legal_moves(self):
+        self.assertEqual(
+            self.bot.legal_moves(self.bot.hands[0]),
+            ["HIT", "STAND", "SPLIT", "DOUBLE DOWN"]
+        )
+
+    def test_bot_split_places_second_bet(self):
+        self.bot.move_strategy = lambda hand, dealer_hand, moves: "SPLIT"
+        move = self.bot.check_hand(self.bot.hands[0], self.dealer_hand)
+        self.assertEqual(move, "SPLIT")
+        self.assertEqual(self.bot.placed_bet, 40)
+        self.assertEqual(self.bot.chips, 10)
+
+    def test_bot_illegal_move(self):
+        self.bot.chips = 0
+        self.bot.move_strategy = lambda hand, dealer_hand, moves: "SPLIT"
+        with self.assertRaises(exceptions.MoveError):
+            self.bot.check_hand(self.bot.hands[0], self.dealer_hand)
+
+
+class TestHeadlessRounds(TestCase):
+    '''Verify that rounds are played without any terminal interaction.'''
+
+    def setUp(self):
+        self.bot = classes.Bot(
+            engine.flat_bet(10), engine.mimic_dealer, chips=10 ** 6
+        )
+        self.dealer = classes.Dealer()
+
+    @patch("classes.screen")
+    @patch("classes.input")
+    def test_play_rounds(self, mock_input, mock_screen):
+        played = engine.play_rounds(self.bot, self.dealer, 500)
+        self.assertEqual(played, 500)
+        mock_input.assert_not_called()
+        self.assertEqual(mock_screen.method_calls, [])
+        self.assertEqual(len(self.dealer.cards.cards), 208)
+
+    def test_play_rounds_until_broke(self):
+        self.bot.chips = 10
+        self.bot.move_strategy = lambda hand, dealer_hand, moves: "STAND"
+        played = engine.play_rounds(self.bot, self.dealer, 10 ** 4)
+        self.assertLess(played, 10 ** 4)
+        self.assertLess(self.bot.chips, 10)
+
+
+def stack(dealer, cards):
+    '''Put `cards` on top of the dealer's shoe.'''
+    for i, card in enumerate(cards):
+        dealer.cards.cards[i] = card.code
+    dealer.cards.position = 0
+
+
+class TestTableRound(TestCase):
+    '''Verify that a table deals to every seat in turn from one shoe,
+    that the dealer draws once and that every hand is paid its own bet.'''
+
+    def setUp(self):
+        self.dealer = classes.Dealer()
+        self.players = [
+            classes.Bot(
+                engine.flat_bet(10),
+                lambda hand, dealer_hand, moves: "STAND"
+            ) for _ in range(3)
+        ]
+        self.table = engine.Table(self.dealer, self.players)
+
+    def test_table_seat_limit(self):
+        for _ in range(engine.MAX_SEATS - 3):
+            self.table.sit(classes.Bot(engine.flat_bet(), engine.mimic_dealer))
+        with self.assertRaises(exceptions.TableError):
+            self.table.sit(classes.Player())
+
+    def test_table_deal_order(self):
+        cards = [classes.Card("Clubs", value) for value in (2, 3, 4, 5)] + [
+            classes.Card("Hearts", value) for value in (6, 7, 8, 9)
+        ] + [classes.Card("Spades", 10)]
+        stack(self.dealer, cards)
+        self.table.play_round()
+        for seat, player in enumerate(self.players):
+            with self.subTest(seat=seat):
+                self.assertEqual(
+                    player.hands[0].cards, [cards[seat], cards[seat + 4]]
+                )
+        self.assertEqual(
+            self.dealer.hand.cards, [cards[3], cards[7], cards[8]]
+        )
+        self.assertEqual(
+            [player.chips for player in self.players], [60, 60, 60]
+        )
+
+    def test_table_split_and_push(self):
+        self.players[0].move_strategy = (
+            lambda hand, dealer_hand, moves:
+            "SPLIT" if "SPLIT" in moves else "STAND"
+        )
+        self.players[1].move_strategy = (
+            lambda hand, dealer_hand, moves: "DOUBLE DOWN"
+        )
+        stack(self.dealer, [
+            classes.Card("Clubs", 8), classes.Card("Clubs", 5),
+            classes.Card("Clubs", "King"), classes.Card("Spades", "King"),
+            classes.Card("Hearts", 8), classes.Card("Hearts", 4),
+            classes.Card("Hearts", 7), classes.Card("Spades", 7),
+            classes.Card("Diamonds", "King"), classes.Card("Diamonds", 9),
+            classes.Card("Clubs", 10)
+        ])
+        self.table.play_round()
+        first, second, third = self.players
+        self.assertEqual([hand.value for hand in first.hands], [18, 17])
+        self.assertEqual(
+            [(hand.win, hand.push) for hand in first.hands],
+            [(True, False), (False, True)]
+        )
+        self.assertEqual(first.chips, 60)
+        self.assertEqual(second.hands[0].value, 19)
+        self.assertEqual(second.chips, 70)
+        self.assertTrue(third.hands[0].push)
+        self.assertEqual(third.chips, 50)
+        self.assertEqual(len(self.dealer.hand), 2)
+
+    def test_split_then_double_chips(self):
+        bot = classes.Bot(
+            engine.flat_bet(10),
+            lambda hand, dealer_hand, moves:
+            "SPLIT" if "SPLIT" in moves else "DOUBLE DOWN",
+            chips=100
+        )
+        stack(self.dealer, [
+            classes.Card("Clubs", 8), classes.Card("Spades", 10),
+            classes.Card("Hearts", 8), classes.Card("Spades", 7),
+            classes.Card("Diamonds", 3), classes.Card("Diamonds", 2),
+            classes.Card("Clubs", 10), classes.Card("Clubs", 9)
+        ])
+        engine.play_round(bot, self.dealer)
+        self.assertEqual([hand.value for hand in bot.hands], [21, 19])
+        self.assertEqual([hand.bet for hand in bot.hands], [20, 20])
+        self.assertTrue(all(hand.win for hand in bot.hands))
+        self.assertEqual(bot.chips, 140)
+
+
+class TestBetRamp(TestCase):
+    '''Verify that a bet ramp bets more units as the true count of the
+    shoe rises.'''
+
+    def test_ramp_follows_true_count(self):
+        dealer = classes.Dealer(decks=1)
+        bot = classes.Bot(engine.bet_ramp(dealer.cards), engine.mimic_dealer)
+        bot.chips = 1000
+        for running_count, bet in [(-3, 10), (0, 10), (2, 20), (3, 40),
+                                   (40, 80)]:
+            with self.subTest(running_count=running_count):
+                dealer.cards.running_count = running_count
+                self.assertEqual(bot.bet_strategy(bot), bet)
+        bot.chips = 50
+        self.assertEqual(bot.bet_strategy(bot), 50)
@@ -0,0 +1,49 @@
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch
+
+import helpers
+
+
+class TestScreenRedraw(TestCase):
+    '''Verify that a screen rewrites only the lines that changed and
+    that it never pauses with no delay.'''
+
+    def setUp(self):
+        self.stream = StringIO()
+        self.screen = helpers.Screen(self.stream, delay=0)
+
+    def output(self):
+        text = self.stream.getvalue()
+        self.stream.seek(0)
+        self.stream.truncate()
+        return text
+
+    def test_first_draw_clears_terminal(self):
+        self.screen.draw("PLAYER: 12\nDEALER: 10")
+        self.assertEqual(
+            self.output(),
+            "\x1b[H\x1b[2J\x1b[1;1HPLAYER: 12\x1b[K"
+            "\x1b[2;1HDEALER: 10\x1b[K\x1b[3;1H\x1b[J"
+        )
+
+    def test_only_changed_lines_rewritten(self):
+        self.screen.draw("OPTIONS\nPLAYER: 12\nDEALER: 10")
+        self.output()
+        self.screen.draw("OPTIONS\nPLAYER: 19\nDEALER: 10")
+        self.assertEqual(
+            self.output(), "\x1b[2;1HPLAYER: 19\x1b[K\x1b[4;1H\x1b[J"
+        )
+        self.screen.draw("OPTIONS")
+        self.assertEqual(self.output(), "\x1b[2;1H\x1b[J")
+
+    @patch("helpers.sleep")
+    def test_pacing(self, mock_sleep):
+        self.screen.message("Cannot double down on this hand...")
+        mock_sleep.assert_not_called()
+        self.screen.delay = 0.5
+        self.screen.message("Cannot double down on this hand...")
+        mock_sleep.assert_called_once_with(0.5)
+        self.assertEqual(
+            self.output(), "Cannot double down on this hand...\n" * 2
+        )
@@ -0,0 +1,119 @@
+import os
+
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import call, patch
+
+import classes
+import engine
+import history
+
+
+def split_pairs(hand, dealer_hand, moves):
+    if "SPLIT" in moves:
+        return "SPLIT"
+    return engine.mimic_dealer(hand, dealer_hand, moves)
+
+
+class TestHandLogRoundTrip(TestCase):
+    '''Verify that every hand played at a logged table reads back from
+    the log with its cards, moves, bet and payout.'''
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hands.bin")
+        self.players = [
+            classes.Bot(engine.flat_bet(10), split_pairs, chips=10 ** 6),
+            classes.Bot(
+                engine.flat_bet(20), engine.mimic_dealer, chips=10 ** 6
+            )
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def play(self, rounds, flush_records):
+        '''Play logged rounds and return the hands as they were at the
+        end of each round.'''
+        played = []
+        dealer = classes.Dealer(rng=Random(7))
+        with history.HandLog(self.path, 7, flush_records) as log:
+            table = engine.Table(dealer, self.players, log)
+            for _ in range(rounds):
+                table.play_round()
+                played.append([
+                    (seat, i, hand, dealer.hand)
+                    for seat, player in enumerate(self.players)
+                    for i, hand in enumerate(player.hands)
+                ])
+                table.next_round()
+        return played
+
+    def test_records_match_hands_played(self):
+        played = self.play(200, flush_records=64)
+        with history.HandLogReader(self.path) as reader:
+            records = list(reader)
+        self.assertEqual(
+            len(records), sum(len(hands) for hands in played)
+        )
+        expected = [
+            (round, hand) for round, hands in enumerate(played)
+            for hand in hands
+        ]
+        for record, (round, (seat, i, hand, dealer_hand)) in zip(
+            records, expected
+        ):
+            self.assertEqual(
+                (record.round, record.seed, record.seat, record.hand),
+                (round, 7, seat, i)
+            )
+            self.assertEqual(list(record.cards), [c.code for c in hand.cards])
+            self.assertEqual(
+                list(record.dealer_cards),
+                [c.code for c in dealer_hand.cards]
+            )
+            self.assertEqual(record.move_names(), hand.moves)
+            self.assertEqual(record.bet, hand.bet)
+            player_hand, logged_dealer_hand = record.hands()
+            self.assertEqual(player_hand.value, hand.value)
+            self.assertEqual(logged_dealer_hand.value, dealer_hand.value)
+        self.assertTrue(any(r.flags & history.SPLIT for r in records))
+        net = [0, 0]
+        for record in records:
+            net[record.seat] += record.net
+        self.assertEqual(
+            net, [player.chips - 10 ** 6 for player in self.players]
+        )
+
+    def test_flushed_once_written(self):
+        dealer = classes.Dealer(rng=Random(7))
+        with history.HandLog(self.path, 7, flush_records=1) as log:
+            engine.Table(dealer, self.players, log).play_round()
+            with history.HandLogReader(self.path) as reader:
+                self.assertEqual(len(reader), sum(
+                    len(player.hands) for player in self.players
+                ))
+                self.assertEqual(reader[-1].round, 0)
+
+    def test_appending_continues_round_numbers(self):
+        self.play(5, flush_records=1)
+        self.play(5, flush_records=1000)
+        with history.HandLogReader(self.path) as reader:
+            rounds = sorted({record.round for record in reader})
+            self.assertEqual(len(reader), len(list(reader.raw())))
+        self.assertEqual(rounds, list(range(10)))
+
+    def test_empty_and_truncated_logs(self):
+        history.HandLog(self.path).close()
+        with history.HandLogReader(self.path) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(list(reader), [])
+        with open(self.path, "ab") as f:
+            f.write(b"\0" * (history.RECORD.size - 1))
+        with self.assertRaises(ValueError):
+            history.HandLogReader(self.path)
+        with patch("history.open", wraps=open) as mock_open:
+            with self.assertRaises(ValueError):
+                history.HandLog(self.path)
+        self.assertNotIn(call(self.path, "ab"), mock_open.call_args_list)
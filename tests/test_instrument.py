@@ -0,0 +1,118 @@
+import json
+import os
+import signal
+
+from io import StringIO
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+import classes
+import engine
+import instrument
+import main
+import rules
+import simulation
+
+
+class TestInstrumentedRounds(TestCase):
+    '''Verify that enabled instrumentation times every phase of a round
+    and that disabling it restores the original functions.'''
+
+    def setUp(self):
+        self.bot = classes.Bot(
+            engine.flat_bet(10), engine.mimic_dealer, chips=10 ** 6
+        )
+        self.dealer = classes.Dealer()
+        self.settle = engine.settle
+        self.deal = classes.Dealer.deal
+
+    def test_phase_timings(self):
+        with instrument.enabled() as recorder:
+            engine.play_rounds(self.bot, self.dealer, 100)
+        snapshot = recorder.snapshot()
+        for name in ["round.play_round", "round.deal_hands",
+                     "round.settle", "Bot.check_hand", "Dealer.deal"]:
+            with self.subTest(name=name):
+                self.assertIn(name, snapshot)
+        self.assertEqual(snapshot["round.play_round"]["count"], 100)
+        self.assertGreaterEqual(
+            snapshot["round.play_round"]["p99_us"],
+            snapshot["round.play_round"]["p50_us"]
+        )
+        self.assertEqual(
+            json.loads(recorder.report("json"))["round.settle"]["count"], 100
+        )
+        self.assertIn("round.play_dealer", recorder.report())
+
+    def test_disable_restores_originals(self):
+        instrument.enable()
+        self.assertIsNot(engine.settle, self.settle)
+        instrument.disable()
+        self.assertIs(engine.settle, self.settle)
+        self.assertIs(classes.Dealer.deal, self.deal)
+
+
+class TestInstrumentedCallers(TestCase):
+    '''Verify that rounds played from the terminal game, from the
+    simulation and by compiled rules are timed.'''
+
+    def test_game_rounds_timed(self):
+        bot = classes.Bot(engine.flat_bet(10), engine.mimic_dealer)
+        dealer = classes.Dealer()
+        with instrument.enabled() as recorder:
+            for _ in range(3):
+                main.game(bot, dealer)
+                engine.next_round(bot, dealer)
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot["round.play_round"]["count"], 3)
+        self.assertEqual(snapshot["round.next_round"]["count"], 3)
+
+    def test_simulation_rounds_timed(self):
+        with instrument.enabled() as recorder:
+            simulation.play_chunk(
+                0, engine.flat_bet(10), engine.mimic_dealer, 4, 0.75,
+                False, False, None, 0, 20
+            )
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot["round.play_round"]["count"], 20)
+        self.assertEqual(snapshot["round.next_round"]["count"], 20)
+
+    def test_compiled_rounds_timed(self):
+        table_rules = rules.Rules(surrender=True)
+        with instrument.enabled() as recorder:
+            simulation.play_chunk(
+                0, engine.flat_bet(10), engine.mimic_dealer, 4, 0.75,
+                False, False, table_rules, 0, 20
+            )
+            table = engine.Table(
+                table_rules.dealer(),
+                [classes.Bot(engine.flat_bet(10), engine.mimic_dealer)],
+                rules=table_rules
+            )
+            table.play_round()
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot["Round.play_round"]["count"], 20)
+        self.assertEqual(snapshot["Round.play_table_round"]["count"], 21)
+        self.assertEqual(snapshot["Round.settle"]["count"], 21)
+
+
+class TestReportOnSignal(TestCase):
+    '''Verify that a report is written when the process is signalled
+    and that a platform without SIGUSR1 asks for a signal.'''
+
+    @skipIf(not hasattr(signal, "SIGUSR1"), "no SIGUSR1 on this platform")
+    def test_report_on_sigusr1(self):
+        self.addCleanup(
+            signal.signal, signal.SIGUSR1, signal.getsignal(signal.SIGUSR1)
+        )
+        stream = StringIO()
+        recorder = instrument.Recorder()
+        recorder.record("round.settle", 0.001)
+        recorder.report_on_signal(stream=stream)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        self.assertIn("round.settle", stream.getvalue())
+
+    def test_no_sigusr1(self):
+        with patch("instrument.signal", spec=["signal"]):
+            with self.assertRaises(ValueError):
+                instrument.Recorder().report_on_signal()
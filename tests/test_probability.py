@@ -0,0 +1,98 @@
+from collections import Counter
+from itertools import permutations
+from unittest import TestCase
+from unittest.mock import patch
+
+import classes
+import probability
+
+
+class TestDealerDistributionExact(TestCase):
+    '''Verify that the dealer's final total distribution matches
+    playing out every order of a small shoe.'''
+
+    def setUp(self):
+        self.cards = [
+            classes.Card("Clubs", "King"), classes.Card("Hearts", 10),
+            classes.Card("Clubs", 6), classes.Card("Spades", 5),
+            classes.Card("Hearts", 2), classes.Card("Spades", "Ace"),
+            classes.Card("Diamonds", "Ace")
+        ]
+        self.up_card = classes.Card("Diamonds", 6)
+
+    def test_distribution_matches_enumeration(self):
+        orders = list(permutations(self.cards))
+        counts = probability.composition(card.code for card in self.cards)
+        for hit_soft_17 in (False, True):
+            finals = Counter()
+            for order in orders:
+                hand = classes.Hand([self.up_card])
+                for card in order:
+                    if hand.value >= 17 and not (
+                        hand.value == 17 and hand.soft and hit_soft_17
+                    ):
+                        break
+                    hand.append(card)
+                finals[min(hand.value, probability.BUST)] += 1
+            distribution = probability.dealer_distribution(
+                6, counts, hit_soft_17
+            )
+            for outcome, p in zip(probability.OUTCOMES, distribution):
+                with self.subTest(hit_soft_17=hit_soft_17, outcome=outcome):
+                    self.assertAlmostEqual(p, finals[outcome] / len(orders))
+
+    def test_peek_distribution(self):
+        counts = probability.remove(
+            probability.composition(classes.DECK * 6), 10
+        )
+        natural = counts[-1] / sum(counts)
+        unseen = probability.dealer_distribution(10, counts)
+        peeked = probability.dealer_distribution(10, counts, peek=True)
+        self.assertAlmostEqual(sum(peeked), 1)
+        for outcome, p, q in zip(probability.OUTCOMES, unseen, peeked):
+            with self.subTest(outcome=outcome):
+                self.assertAlmostEqual(
+                    p, (1 - natural) * q + natural * (outcome == 21)
+                )
+
+    def test_full_shoe_distribution(self):
+        counts = probability.remove(
+            probability.composition(classes.DECK * 6), 10
+        )
+        distribution = probability.dealer_distribution(10, counts)
+        self.assertAlmostEqual(sum(distribution), 1)
+        self.assertAlmostEqual(distribution[-1], 0.2125, places=3)
+
+
+class TestAdvisorActionValues(TestCase):
+    '''Verify that the advisor values every legal move of a hand and
+    that the values are shown with the player's options.'''
+
+    def setUp(self):
+        self.dealer = classes.Dealer(decks=8)
+        self.player = classes.Player()
+        self.player.advisor = probability.Advisor(self.dealer.cards)
+        self.player.place_bet(10)
+        self.player.hands = [classes.Hand([
+            classes.Card("Clubs", 10), classes.Card("Hearts", "Ace")
+        ])]
+        self.dealer.hand = classes.Hand([
+            classes.Card("Spades", 6), classes.Card("Spades", 10)
+        ])
+
+    def test_advisor_values(self):
+        values = self.player.advisor.action_values(
+            self.player.hands[0], self.dealer.hand,
+            self.player.legal_moves(self.player.hands[0])
+        )
+        self.assertEqual(set(values), {"HIT", "STAND", "DOUBLE DOWN"})
+        self.assertEqual(max(values, key=values.get), "STAND")
+        self.assertGreater(values["STAND"], 0.5)
+
+    @patch("classes.screen")
+    @patch("classes.input", return_value="STAND")
+    def test_advisor_values_shown(self, mock_input, mock_screen):
+        self.player.check_hand(self.player.hands[0], self.dealer.hand)
+        options = mock_screen.draw.call_args_list[0].args[0]
+        self.assertIn("Play your hand against the dealer as is (EV +", options)
+        self.assertNotIn("pip/face card (EV", options)
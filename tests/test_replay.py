@@ -0,0 +1,77 @@
+import os
+
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import classes
+import engine
+import exceptions
+import history
+import replay
+
+
+def split_or_double(hand, dealer_hand, moves):
+    if "SPLIT" in moves:
+        return "SPLIT"
+    if "DOUBLE DOWN" in moves and hand.value in (10, 11):
+        return "DOUBLE DOWN"
+    return engine.mimic_dealer(hand, dealer_hand, moves)
+
+
+class TestReplayLoggedRounds(TestCase):
+    '''Verify that logged rounds replay exactly from the seed of their
+    shoe and that the first round that does not is reported.'''
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hands.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def log_session(self, seed, rounds, decks=4):
+        players = [
+            classes.Bot(engine.flat_bet(10), split_or_double, chips=10 ** 6),
+            classes.Bot(engine.flat_bet(25), engine.mimic_dealer, 10 ** 6)
+        ]
+        dealer = classes.Dealer(decks, rng=Random(seed))
+        with history.HandLog(self.path, seed) as log:
+            table = engine.Table(dealer, players, log)
+            for _ in range(rounds):
+                table.play_round()
+                table.next_round()
+
+    def replay(self, decks=4):
+        with history.HandLogReader(self.path) as reader:
+            return replay.replay(reader, decks)
+
+    def test_replay_sessions(self):
+        self.log_session(3, 300)
+        self.log_session(3, 50)
+        self.log_session(11, 200)
+        self.assertEqual(self.replay(), 550)
+
+    def test_replay_with_wrong_shoe_diverges_at_first_round(self):
+        self.log_session(5, 20)
+        with self.assertRaises(exceptions.ReplayError) as diverged:
+            self.replay(decks=6)
+        self.assertEqual(diverged.exception.round, 0)
+
+    def test_replay_pinpoints_tampered_round(self):
+        self.log_session(5, 100)
+        with history.HandLogReader(self.path) as reader:
+            records = list(reader)
+        i = next(i for i, r in enumerate(records) if r.round == 60)
+        records[i] = records[i]._replace(payout=records[i].payout + 10)
+        with self.assertRaises(exceptions.ReplayError) as diverged:
+            replay.replay(records)
+        self.assertEqual(diverged.exception.round, 60)
+
+    def test_replay_reports_missing_moves(self):
+        self.log_session(9, 30)
+        with history.HandLogReader(self.path) as reader:
+            records = [r._replace(moves=b"") for r in reader]
+        with self.assertRaises(exceptions.ReplayError) as diverged:
+            replay.replay(records)
+        self.assertEqual(diverged.exception.round, 0)
@@ -0,0 +1,89 @@
+from unittest import TestCase, skipIf
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    import ruin
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class TestGamblersRuin(TestCase):
+    '''Verify the chain against the closed forms of the gambler's ruin
+    and that the horizon distribution converges to the exact solve.'''
+
+    def setUp(self):
+        self.outcomes = {-1.0: 0.53, 1.0: 0.47}
+
+    def test_ruin_closed_form(self):
+        ratio = 0.53 / 0.47
+        result = ruin.risk_of_ruin(50, self.outcomes, 100)
+        self.assertAlmostEqual(
+            result["ruin"], (ratio ** 5 - ratio ** 10) / (1 - ratio ** 10)
+        )
+        self.assertAlmostEqual(result["hold"], 0.06)
+
+    def test_fair_game_duration(self):
+        result = ruin.risk_of_ruin(50, {-1.0: 0.5, 1.0: 0.5}, 100)
+        self.assertAlmostEqual(result["ruin"], 0.5)
+        self.assertAlmostEqual(result["expected_rounds"], 25)
+        self.assertAlmostEqual(result["expected_wagered"], 250)
+
+    def test_no_round_played(self):
+        for chips, ruined in [(50, 0.0), (5, 1.0)]:
+            with self.subTest(chips=chips):
+                result = ruin.risk_of_ruin(chips, self.outcomes, 10)
+                self.assertEqual(result["ruin"], ruined)
+                self.assertEqual(result["target"], 1.0 - ruined)
+                self.assertEqual(result["expected_rounds"], 0.0)
+                self.assertEqual(result["expected_final"], chips)
+
+    def test_session_lengths_converge(self):
+        exact = ruin.risk_of_ruin(50, self.outcomes, 100)
+        session = ruin.session_lengths(50, self.outcomes, 2000, target=100)
+        self.assertAlmostEqual(session["ruin"], exact["ruin"])
+        self.assertAlmostEqual(
+            session["expected_rounds"], exact["expected_rounds"]
+        )
+        self.assertAlmostEqual(
+            session["ruin_by_round"].sum() + session["target_by_round"].sum()
+            + session["playing"], 1.0
+        )
+        self.assertEqual(session["ruin_by_round"][:4].tolist(), [0, 0, 0, 0])
+        self.assertAlmostEqual(session["ruin_by_round"][4], 0.53 ** 5)
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class TestBankrollPolicies(TestCase):
+    '''Verify bet policies, doubled losses and sessions without a target.'''
+
+    def setUp(self):
+        self.outcomes = {-2.0: 0.05, -1.0: 0.43, 0.0: 0.1, 1.0: 0.38,
+                         2.0: 0.04}
+
+    def test_flat_session_horizon(self):
+        session = ruin.session_lengths(50, self.outcomes, 50)
+        self.assertAlmostEqual(
+            session["ruin"] + session["playing"], 1.0
+        )
+        self.assertEqual(session["target"], 0.0)
+        self.assertGreater(session["ruin"], 0.1)
+
+    def test_policy_matches_flat_bet(self):
+        flat = ruin.risk_of_ruin(500, self.outcomes, 1000)
+        policy = ruin.risk_of_ruin(500, self.outcomes, 1000, bet=lambda c: 10)
+        self.assertAlmostEqual(flat["ruin"], policy["ruin"])
+        ramp = ruin.risk_of_ruin(
+            500, self.outcomes, 1000, bet=lambda c: 10 if c < 600 else 50
+        )
+        self.assertNotAlmostEqual(flat["ruin"], ramp["ruin"])
+        ruined = ruin.risk_of_ruin(5, self.outcomes, 1000)
+        self.assertEqual(ruined["ruin"], 1.0)
+        self.assertEqual(ruined["expected_rounds"], 0.0)
+
+    def test_outcome_distribution(self):
+        outcomes = ruin.outcome_distribution(2000, seed=1)
+        self.assertAlmostEqual(sum(outcomes.values()), 1.0)
+        self.assertIn(-1.0, outcomes)
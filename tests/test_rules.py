@@ -0,0 +1,171 @@
+from unittest import TestCase
+
+import classes
+import engine
+import rules
+import simulation
+from stats import Aggregator
+from tests.test_engine import stack
+
+
+def cards(*values):
+    return [classes.Card(suit, value) for suit, value in values]
+
+
+def split_or_stand(hand, dealer_hand, moves):
+    return "SPLIT" if "SPLIT" in moves else "STAND"
+
+
+class TestCompiledTables(TestCase):
+    '''Verify that each rule is resolved into the compiled tables.'''
+
+    def test_dealer_soft_17(self):
+        stand = rules.Rules().compile()
+        hit = rules.Rules(hit_soft_17=True).compile()
+        self.assertEqual(stand.dealer_hits[17 + 32], 0)
+        self.assertEqual(hit.dealer_hits[17 + 32], 1)
+        self.assertEqual(stand.dealer_hits[17], hit.dealer_hits[17])
+        self.assertEqual(list(stand.dealer_hits[:17]), [1] * 17)
+        self.assertIs(rules.Rules().compile(), stand)
+
+    def test_legal_moves(self):
+        das = rules.Rules(surrender=True).compile()
+        no_das = rules.Rules(double_after_split=False).compile()
+        pair = rules.TWO_CARDS | rules.PAIR | rules.ROOM | rules.COVERED
+        self.assertEqual(
+            das.moves[pair],
+            ("HIT", "STAND", "SPLIT", "DOUBLE DOWN", "SURRENDER")
+        )
+        self.assertEqual(
+            das.moves[pair & ~rules.COVERED], ("HIT", "STAND", "SURRENDER")
+        )
+        self.assertEqual(
+            das.moves[pair | rules.SPLIT],
+            ("HIT", "STAND", "SPLIT", "DOUBLE DOWN")
+        )
+        self.assertEqual(
+            no_das.moves[pair | rules.SPLIT], ("HIT", "STAND", "SPLIT")
+        )
+        self.assertEqual(das.moves[0], ("HIT", "STAND"))
+
+
+class TestCompiledRounds(TestCase):
+    '''Verify naturals, the dealer's peek and soft 17, resplits and
+    surrender in rounds stacked from known cards.'''
+
+    def play(self, table_rules, stacked, move_strategy=split_or_stand):
+        self.player = classes.Bot(engine.flat_bet(10), move_strategy)
+        self.dealer = table_rules.dealer()
+        stack(self.dealer, stacked)
+        table_rules.compile().play_round(self.player, self.dealer)
+        return self.player
+
+    def test_natural_payouts(self):
+        natural = cards(("Clubs", "Ace"), ("Clubs", 9), ("Clubs", "King"),
+                        ("Hearts", 7), ("Hearts", 3))
+        for pays, chips in [
+            (rules.EVEN_MONEY, 60), (rules.THREE_TO_TWO, 65),
+            (rules.SIX_TO_FIVE, 62)
+        ]:
+            with self.subTest(pays=pays):
+                player = self.play(rules.Rules(blackjack_pays=pays), natural)
+                self.assertEqual(player.chips, chips)
+                self.assertEqual(player.hands[0].moves, [])
+                self.assertEqual(len(self.dealer.hand), 2)
+        aggregator = Aggregator()
+        aggregator.add_hand(player.hands[0])
+        self.assertEqual(aggregator.total, 12)
+
+    def test_dealer_peek(self):
+        def never(hand, dealer_hand, moves):
+            raise AssertionError("The round should end on the peek")
+        player = self.play(rules.Rules(), cards(
+            ("Clubs", 10), ("Clubs", "Ace"), ("Hearts", 9),
+            ("Hearts", "Queen")
+        ), never)
+        self.assertEqual(player.chips, 40)
+        self.assertTrue(self.dealer.winner)
+        player = self.play(rules.Rules(), cards(
+            ("Clubs", "Ace"), ("Spades", "Ace"), ("Hearts", "Jack"),
+            ("Hearts", "Queen")
+        ), never)
+        self.assertTrue(player.hands[0].push)
+        self.assertEqual(player.chips, 50)
+
+    def test_dealer_soft_17(self):
+        stacked = cards(("Clubs", 10), ("Clubs", "Ace"), ("Hearts", "King"),
+                        ("Hearts", 6), ("Spades", 4))
+        self.assertEqual(self.play(rules.Rules(), stacked).chips, 60)
+        self.assertEqual(self.dealer.hand.value, 17)
+        player = self.play(rules.Rules(hit_soft_17=True), stacked)
+        self.assertEqual(player.chips, 40)
+        self.assertEqual(self.dealer.hand.value, 21)
+
+    def test_resplits(self):
+        stacked = cards(
+            ("Clubs", 8), ("Spades", 10), ("Hearts", 8), ("Spades", 7),
+            ("Diamonds", 8), ("Clubs", 3), ("Clubs", 2), ("Diamonds", 3)
+        )
+        player = self.play(rules.Rules(), stacked)
+        self.assertEqual([hand.value for hand in player.hands], [16, 11])
+        self.assertEqual(player.chips, 30)
+        player = self.play(rules.Rules(resplits=1), stacked)
+        self.assertEqual(
+            [hand.value for hand in player.hands], [10, 11, 11]
+        )
+        self.assertEqual(
+            player.hands[0].moves, ["SPLIT", "SPLIT", "STAND"]
+        )
+        self.assertEqual(player.chips, 20)
+
+    def test_surrender(self):
+        player = self.play(rules.Rules(surrender=True), cards(
+            ("Clubs", 10), ("Clubs", 10), ("Hearts", 6), ("Hearts", 8)
+        ), lambda hand, dealer_hand, moves: "SURRENDER")
+        self.assertEqual(player.chips, 45)
+        self.assertTrue(player.hands[0].surrender)
+        self.assertEqual(len(self.dealer.hand), 2)
+
+    def test_bets_pay_whole_chips(self):
+        for table_rules, bet, unit in [
+            (rules.Rules(surrender=True), 15, 2),
+            (rules.Rules(blackjack_pays=rules.THREE_TO_TWO), 15, 2),
+            (rules.Rules(blackjack_pays=rules.SIX_TO_FIVE), 12, 5),
+            (rules.Rules(surrender=True, blackjack_pays=rules.SIX_TO_FIVE),
+             15, 10)
+        ]:
+            with self.subTest(rules=table_rules):
+                self.assertEqual(table_rules.bet_unit, unit)
+                player = classes.Bot(engine.flat_bet(bet), split_or_stand)
+                with self.assertRaises(ValueError):
+                    table_rules.compile().play_round(
+                        player, classes.Dealer()
+                    )
+                self.assertEqual((player.chips, player.placed_bet), (50, 0))
+                self.assertEqual(player.hands, [])
+
+
+class TestRulesInSimulation(TestCase):
+    '''Verify that tables and simulation runs play by compiled rules.'''
+
+    def test_table_rules(self):
+        table_rules = rules.Rules(surrender=True)
+        dealer = table_rules.dealer()
+        player = classes.Bot(
+            engine.flat_bet(10), lambda hand, dealer_hand, moves: "SURRENDER"
+        )
+        table = engine.Table(dealer, [player], rules=table_rules)
+        stack(dealer, cards(
+            ("Clubs", 10), ("Clubs", 10), ("Hearts", 6), ("Hearts", 8)
+        ))
+        table.play_round()
+        self.assertEqual(player.chips, 45)
+
+    def test_simulation_rules(self):
+        run = simulation.run(
+            2000, seed=2, workers=1,
+            rules=rules.Rules(decks=6, blackjack_pays=rules.THREE_TO_TWO)
+        )
+        self.assertEqual(run["rounds"], 2000)
+        self.assertEqual(run["hands"]["total"], run["net"])
+        self.assertNotEqual(run, simulation.run(2000, seed=2, workers=1))
@@ -0,0 +1,80 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+import server
+
+
+async def client(port, rounds, moves=("STAND",)):
+    '''Play `rounds` rounds at a table, answering each MOVE? with the
+    next of `moves` (the last one repeats), and return the lines
+    received.'''
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    moves = list(moves)
+    lines = []
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        lines.append(line)
+        if line == "BET?":
+            played = sum(line.startswith("RESULT") for line in lines)
+            writer.write(b"10\n" if played < rounds else b"QUIT\n")
+        elif line.startswith("MOVE?"):
+            move = moves.pop(0) if len(moves) > 1 else moves[0]
+            writer.write(f"{move}\n".encode())
+    writer.close()
+    return lines
+
+
+class TestTableServer(IsolatedAsyncioTestCase):
+    '''Verify that many tables are played at once over TCP and that an
+    idle connection is closed after its timeout.'''
+
+    async def asyncSetUp(self):
+        self.server = await server.serve(port=0, timeout=0.5)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_concurrent_tables(self):
+        results = await asyncio.gather(
+            *(client(self.port, 3) for _ in range(100))
+        )
+        tables = {lines[0] for lines in results}
+        self.assertEqual(len(tables), 100)
+        for lines in results:
+            self.assertEqual(
+                sum(line.startswith("RESULT") for line in lines), 3
+            )
+            self.assertEqual(lines[-1], "BYE quit")
+
+    async def test_invalid_move(self):
+        lines = await client(self.port, 1, moves=("FOLD", "STAND"))
+        self.assertIn("ERROR FOLD is not allowed on this hand", lines)
+
+    async def test_undecodable_bet(self):
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", self.port
+        )
+        lines = []
+        while True:
+            line = (await reader.readline()).decode().strip()
+            if not line:
+                break
+            lines.append(line)
+            if line == "BET?":
+                first = lines.count("BET?") == 1
+                writer.write(b"\xff\n" if first else b"QUIT\n")
+        writer.close()
+        self.assertIn("ERROR Invalid bet by player...", lines)
+        self.assertEqual(lines[-1], "BYE quit")
+
+    async def test_idle_timeout(self):
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", self.port
+        )
+        lines = (await reader.read()).decode().splitlines()
+        writer.close()
+        self.assertEqual(lines[-2:], ["BET?", "BYE timeout"])
@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+import simulation
+
+
+class TestSimulationReproducible(TestCase):
+    '''Verify that a run gives the same tallies for a seed no matter
+    how many worker processes play it.'''
+
+    def test_same_result_for_any_worker_count(self):
+        results = simulation.run(3000, seed=42, workers=1, chunk_size=500)
+        self.assertEqual(results["rounds"], 3000)
+        self.assertEqual(
+            results["wins"] + results["losses"] + results["pushes"], 3000
+        )
+        self.assertEqual(
+            results,
+            simulation.run(3000, seed=42, workers=3, chunk_size=500)
+        )
+
+    def test_different_seed_different_result(self):
+        self.assertNotEqual(
+            simulation.run(1000, seed=1, workers=1),
+            simulation.run(1000, seed=2, workers=1)
+        )
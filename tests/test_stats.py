@@ -0,0 +1,88 @@
+from random import Random
+from statistics import fmean, variance
+from unittest import TestCase
+
+import classes
+import simulation
+import stats
+
+
+class TestAggregatorMoments(TestCase):
+    '''Verify that the streaming mean and variance match those of the
+    whole sample and survive being merged from pieces.'''
+
+    def setUp(self):
+        rng = Random(8)
+        self.sample = [rng.choice((-20, -10, -10, 0, 10, 10, 15, 20))
+                       for _ in range(5000)]
+
+    def aggregate(self, values):
+        aggregator = stats.Aggregator()
+        for value in values:
+            aggregator.add(value)
+        return aggregator
+
+    def test_mean_and_variance(self):
+        aggregator = self.aggregate(self.sample)
+        self.assertEqual(aggregator.count, 5000)
+        self.assertEqual(aggregator.total, sum(self.sample))
+        self.assertAlmostEqual(aggregator.mean, fmean(self.sample))
+        self.assertAlmostEqual(aggregator.variance, variance(self.sample))
+        low, high = aggregator.confidence_interval()
+        self.assertAlmostEqual((low + high) / 2, aggregator.mean)
+
+    def test_merge(self):
+        merged = self.aggregate([])
+        for start in range(0, 5000, 1300):
+            merged.merge(self.aggregate(self.sample[start:start + 1300]))
+        whole = self.aggregate(self.sample)
+        self.assertAlmostEqual(merged.mean, whole.mean)
+        self.assertAlmostEqual(merged.variance, whole.variance)
+        self.assertEqual(merged.histogram, whole.histogram)
+        with self.assertRaises(ValueError):
+            merged.merge(stats.Aggregator(bins=4))
+
+    def test_histogram_bins(self):
+        aggregator = stats.Aggregator(low=-20, high=20, bins=4)
+        for value in (-100, -20, -11, -10, 0, 9, 10, 20, 100):
+            aggregator.add(value)
+        self.assertEqual(aggregator.histogram, [3, 1, 2, 3])
+        self.assertEqual(
+            list(aggregator.snapshot()["histogram"]), [-20, -10, 0, 10]
+        )
+
+
+class TestAggregatorHands(TestCase):
+    '''Verify that hands are counted by the outcome flags they carry.'''
+
+    def hand(self, values, bet=10, **flags):
+        hand = classes.Hand([classes.Card("Clubs", v) for v in values])
+        hand.bet = bet
+        for flag, value in flags.items():
+            setattr(hand, flag, value)
+        return hand
+
+    def test_outcomes(self):
+        aggregator = stats.Aggregator()
+        for hand in [
+            self.hand(["Ace", "King"], win=True),
+            self.hand([8, 3, 9], bet=20, double_down=True, win=True),
+            self.hand([10, 6, 9]),
+            self.hand([8, 10], split=True, push=True),
+            self.hand([8, 2, "Ace"], split=True)
+        ]:
+            aggregator.add_hand(hand)
+        snapshot = aggregator.snapshot()
+        self.assertEqual(snapshot["total"], 10 + 20 - 10 + 0 - 10)
+        self.assertEqual(
+            [snapshot[outcome] for outcome in stats.OUTCOMES],
+            [2, 2, 1, 1, 1, 1, 2]
+        )
+
+    def test_simulation_hand_stats(self):
+        results = simulation.run(2000, seed=3, workers=1, chunk_size=300)
+        hands = results["hands"]
+        self.assertEqual(hands["count"], 2000)
+        self.assertEqual(hands["total"], results["net"])
+        self.assertEqual(hands["busts"], results["busts"])
+        self.assertEqual(sum(hands["histogram"].values()), 2000)
@@ -0,0 +1,124 @@
+from array import array
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+import cache
+import classes
+import strategy
+from rules import Rules
+
+
+class TestBasicStrategyChart(TestCase):
+    '''Verify that the generated chart gives the expected moves and
+    falls back when a move is not allowed.'''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.chart = strategy.basic_strategy(decks=2, workers=1)
+
+    def setUp(self):
+        self.dealer_hand = classes.Hand([
+            classes.Card("Spades", 6), classes.Card("Spades", "King")
+        ])
+
+    def move(self, cards, moves=None):
+        hand = classes.Hand(cards)
+        if moves is None:
+            player = classes.Player()
+            player.place_bet(10)
+            player.hands = [hand]
+            moves = player.legal_moves(hand)
+        return self.chart.move(hand, self.dealer_hand, moves)
+
+    def test_chart_is_cached(self):
+        self.assertIs(strategy.basic_strategy(decks=2), self.chart)
+        self.assertEqual(len(self.chart.table), 660)
+
+    def test_chart_moves(self):
+        hands = [
+            ([classes.Card("Clubs", 10), classes.Card("Hearts", 8)], "STAND"),
+            ([classes.Card("Clubs", 2), classes.Card("Hearts", 3)], "HIT"),
+            ([classes.Card("Clubs", 8), classes.Card("Hearts", 3)],
+             "DOUBLE DOWN"),
+            ([classes.Card("Clubs", 8), classes.Card("Hearts", 8)], "SPLIT"),
+        ]
+        for cards, move in hands:
+            with self.subTest(move=move):
+                self.assertEqual(self.move(cards), move)
+
+    def test_chart_double_down_not_allowed(self):
+        cards = [
+            classes.Card("Clubs", 2), classes.Card("Hearts", 3),
+            classes.Card("Hearts", 6)
+        ]
+        self.assertEqual(self.move(cards, ["HIT", "STAND"]), "HIT")
+
+
+class TestCachedEvTable(TestCase):
+    '''Verify that an EV table is worked out once and loaded from the
+    cache afterwards, giving the same chart.'''
+
+    def test_warm_cache(self):
+        with TemporaryDirectory() as directory:
+            table_cache = cache.TableCache(directory)
+            values = strategy.ev_table(decks=2, workers=1, cache=table_cache)
+            self.assertEqual(
+                len(values),
+                len(strategy.UP_CARDS) * len(strategy.ROWS)
+                * len(strategy.EV_MOVES)
+            )
+            with patch("strategy.ev_column", side_effect=AssertionError):
+                loaded = strategy.ev_table(
+                    decks=2, workers=1, cache=table_cache
+                )
+            self.assertEqual(bytes(loaded), bytes(values))
+            self.assertEqual(
+                strategy.Chart.from_ev_table(loaded).table,
+                strategy.basic_strategy(decks=2, workers=1).table
+            )
+
+
+class TestRulesEvTables(TestCase):
+    '''Verify that EV tables and charts are kept apart for rule sets
+    that change the values and refused for rules that are not
+    modelled.'''
+
+    def column(self, model, up_card):
+        return array("d", model[1:])
+
+    def test_tables_keyed_on_rules(self):
+        with TemporaryDirectory() as directory, patch(
+            "strategy.ev_column", side_effect=self.column
+        ):
+            table_cache = cache.TableCache(directory)
+            for rules, expected in [
+                (None, [False, True, False]), (Rules(2), [False, True, True]),
+                (Rules(2, hit_soft_17=True), [True, True, True]),
+                (Rules(2, double_after_split=False), [False, False, True])
+            ]:
+                with self.subTest(rules=rules):
+                    values = strategy.ev_table(
+                        2, workers=1, cache=table_cache, rules=rules
+                    )
+                    self.assertEqual(list(values[:3]), expected)
+
+    def test_charts_keyed_on_rules(self):
+        rules = Rules(2, hit_soft_17=True)
+        self.addCleanup(
+            strategy.CHARTS.pop, strategy.modelled(2, rules), None
+        )
+        values = memoryview(array("d", [0.0] * (
+            len(strategy.UP_CARDS) * len(strategy.ROWS)
+            * len(strategy.EV_MOVES)
+        )))
+        with patch("strategy.ev_table", return_value=values):
+            chart = strategy.basic_strategy(rules=rules)
+        self.assertIsNot(chart, strategy.basic_strategy(decks=2, workers=1))
+        self.assertIs(strategy.basic_strategy(rules=rules), chart)
+
+    def test_unmodelled_rules(self):
+        for rules in [Rules(resplits=2), Rules(surrender=True)]:
+            with self.subTest(rules=rules):
+                with self.assertRaises(ValueError):
+                    strategy.ev_table(workers=1, rules=rules)